@@ -1,3 +1,8 @@
 from .nfa import NFA
 from .dfa import DFA
+from .compiled import CompiledDFA
+from .lazy import LazyDFA
+from .lexer import Lexer
+from .compact import CompactDFA, CompactNFA, NameTable
+from .automaton import deferred_validation
 from .types import Transitions
@@ -1,12 +1,124 @@
-from typing import Set, Union
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    Union,
+)
 from tabulate import tabulate
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from threading import local
+from weakref import WeakSet
 from .constants import START, FINAL
 from .types import Symbol, State, Transitions
 
 
+_deferred = local()
+
+
+@contextmanager
+def deferred_validation() -> Iterator[None]:
+    """
+    Adia as chamadas de validate() feitas dentro do bloco, inclusive pelos
+    autômatos intermediários de uma sequência de operações. Cada autômato
+    ainda vivo ao fim do bloco é validado uma única vez.
+    """
+    if getattr(_deferred, "automata", None) is not None:
+        yield
+        return
+
+    pending: "WeakSet[Automaton]" = WeakSet()
+    _deferred.automata = pending
+    try:
+        yield
+    finally:
+        _deferred.automata = None
+
+    for automaton in list(pending):
+        automaton.validate()
+
+
+class _TrackedSet(set):  # type: ignore
+    """Conjunto que avisa o autômato dono sempre que é alterado."""
+
+    def __init__(self, on_change: Callable[[], None], states: Iterable[State] = ()):
+        super().__init__(states)
+        self._on_change = on_change
+
+    def __repr__(self) -> str:
+        return repr(set(self))
+
+    def add(self, state: State) -> None:
+        self._on_change()
+        super().add(state)
+
+    def discard(self, state: State) -> None:
+        self._on_change()
+        super().discard(state)
+
+    def remove(self, state: State) -> None:
+        self._on_change()
+        super().remove(state)
+
+    def pop(self) -> State:
+        self._on_change()
+        return super().pop()
+
+    def clear(self) -> None:
+        self._on_change()
+        super().clear()
+
+    def update(self, *others: Iterable[State]) -> None:
+        self._on_change()
+        super().update(*others)
+
+    def difference_update(self, *others: Iterable[State]) -> None:
+        self._on_change()
+        super().difference_update(*others)
+
+    def intersection_update(self, *others: Iterable[State]) -> None:
+        self._on_change()
+        super().intersection_update(*others)
+
+    def symmetric_difference_update(self, other: Iterable[State]) -> None:
+        self._on_change()
+        super().symmetric_difference_update(other)
+
+    def __ior__(self, other):  # type: ignore
+        self._on_change()
+        return super().__ior__(other)
+
+    def __iand__(self, other):  # type: ignore
+        self._on_change()
+        return super().__iand__(other)
+
+    def __isub__(self, other):  # type: ignore
+        self._on_change()
+        return super().__isub__(other)
+
+    def __ixor__(self, other):  # type: ignore
+        self._on_change()
+        return super().__ixor__(other)
+
+
 class Automaton(ABC):
     def __init__(self) -> None:
+        # Estruturas derivadas (tabelas compiladas, AFD equivalente, ...)
+        # descartadas sempre que o autômato é alterado
+        self._cache: Dict[str, Any] = {}
+
+        # Quantidade de estados que definem cada símbolo, mantida a cada
+        # transição adicionada ou removida para que o alfabeto seja consultado
+        # em O(1). A tabela de transições é um dict comum: alterações feitas
+        # diretamente nela, e não pelos métodos do autômato, não são vistas
+        # pelo alfabeto nem pelas estruturas derivadas.
+        self._symbol_count: Dict[Symbol, int] = {}
+
         self.initial_state: Union[State, None] = None
         self.final_states: Set[State] = set()
 
@@ -33,17 +145,51 @@ class Automaton(ABC):
         return tabulate(table, tablefmt="fancy_grid")
 
     def __repr__(self) -> str:
-        return f"Automaton(\n states={self.states},\n alphabet={self.alphabet},\n initial_state={self.initial_state},\n final_states={self.final_states},\n transitions={self.transitions}\n)"
+        return f"Automaton(\n states={set(self.states)},\n alphabet={set(self.alphabet)},\n initial_state={self.initial_state},\n final_states={self.final_states},\n transitions={self.transitions}\n)"
 
     @property
-    def states(self) -> Set[State]:
-        return set(self.transitions.keys())
+    def initial_state(self) -> Union[State, None]:
+        return self._initial_state
+
+    @initial_state.setter
+    def initial_state(self, state: Union[State, None]) -> None:
+        self._invalidate()
+        self._initial_state = state
 
     @property
-    def alphabet(self) -> Set[Symbol]:
-        return set(
-            symbol for symbols in self.transitions.values() for symbol in symbols.keys()
-        )
+    def final_states(self) -> Set[State]:
+        return self._final_states
+
+    @final_states.setter
+    def final_states(self, states: Iterable[State]) -> None:
+        self._invalidate()
+        self._final_states = _TrackedSet(self._invalidate, states)
+
+    @property
+    def _transitions(self) -> Transitions:
+        return self._transition_table
+
+    @_transitions.setter
+    def _transitions(self, transitions: Transitions) -> None:
+        self._invalidate()
+        self._transition_table = transitions
+
+        self._symbol_count = {}
+        for symbols in transitions.values():
+            for symbol in symbols:
+                self._symbol_count[symbol] = self._symbol_count.get(symbol, 0) + 1
+
+    def _invalidate(self) -> None:
+        if self._cache:
+            self._cache.clear()
+
+    @property
+    def states(self) -> AbstractSet[State]:
+        return self.transitions.keys()
+
+    @property
+    def alphabet(self) -> AbstractSet[Symbol]:
+        return self._symbol_count.keys()
 
     @property
     def transitions(self) -> Transitions:
@@ -52,14 +198,31 @@ class Automaton(ABC):
     def add_transition(
         self, state: State, symbol: Symbol, next_states: Set[State]
     ) -> None:
+        self._invalidate()
         if state not in self.transitions:
             self.transitions[state] = {}
 
         if symbol not in self.transitions[state]:
             self.transitions[state][symbol] = set()
+            self._symbol_count[symbol] = self._symbol_count.get(symbol, 0) + 1
 
         self.transitions[state][symbol] |= next_states
 
+    def remove_transition(self, state: State, symbol: Symbol) -> None:
+        """
+        Remove as transições do estado pelo símbolo. O símbolo sai do
+        alfabeto quando nenhum estado o define mais.
+        """
+        symbols = self.transitions.get(state, {})
+        if symbol not in symbols:
+            return
+
+        self._invalidate()
+        del symbols[symbol]
+        self._symbol_count[symbol] -= 1
+        if not self._symbol_count[symbol]:
+            del self._symbol_count[symbol]
+
     def move(self, state: State, symbol: Symbol):
         return self.transitions.get(state, {}).get(symbol, set())
 
@@ -77,14 +240,8 @@ class Automaton(ABC):
                 self.add_transition(parsed_state, symbol, next_states)
 
         for state in known_states:
-            for symbol in self.alphabet:
-                self.add_transition(state, symbol, set())
-
-        for state in self.states:
-            for symbol in self.alphabet:
-                for next_state in self.move(state, symbol):
-                    for symbol in self.alphabet:
-                        self.add_transition(next_state, symbol, set())
+            if state not in self.transitions:
+                self.transitions[state] = {}
 
         self._complete_transitions()
         return self.validate()
@@ -111,25 +268,45 @@ class Automaton(ABC):
         return self.validate()
 
     def _complete_transitions(self):
-        for state in self.states:
-            for symbol in self.alphabet:
-                for next_state in self.move(state, symbol):
-                    for symbol in self.alphabet:
-                        self.add_transition(next_state, symbol, set())
-                self.add_transition(state, symbol, set())
+        # Uma única passagem: estados que só aparecem como destino ganham uma
+        # linha e todo estado passa a definir todos os símbolos do alfabeto
+        transitions = self.transitions
+        missing_states = {
+            next_state
+            for symbols in transitions.values()
+            for next_states in symbols.values()
+            for next_state in next_states
+            if next_state not in transitions
+        }
+        for state in missing_states:
+            transitions[state] = {}
+
+        alphabet = list(self.alphabet)
+        changed = bool(missing_states)
+        for symbols in transitions.values():
+            if len(symbols) == len(alphabet):
+                continue
+            for symbol in alphabet:
+                if symbol not in symbols:
+                    symbols[symbol] = set()
+                    self._symbol_count[symbol] += 1
+            changed = True
+
+        if changed:
+            self._invalidate()
+
+    def _defer_validation(self) -> bool:
+        pending = getattr(_deferred, "automata", None)
+        if pending is None:
+            return False
+        pending.add(self)
+        return True
 
     def validate(self):
-        self._complete_transitions()
-
-        for state in self.states:
-            for symbol in self.alphabet:
-                if not self.move(state, symbol).issubset(self.states):
-                    raise Exception(
-                        f"A next state {self.move(state, symbol)} is not in the states."
-                    )
+        if self._defer_validation():
+            return self
 
-                if symbol not in self.transitions[state]:
-                    raise Exception(f"Symbol {symbol} is not set for state {state}.")
+        self._complete_transitions()
 
         for final_state in self.final_states:
             if final_state not in self.states:
@@ -144,3 +321,6 @@ class Automaton(ABC):
     # (f) Reconhecimento de sentenças em AF
     def recognize_sentence(self, sentence: str) -> bool:
         pass
+
+    def recognize_many(self, sentences: Iterable[str]) -> List[bool]:
+        return [self.recognize_sentence(sentence) for sentence in sentences]
@@ -0,0 +1,41 @@
+from typing import Dict, Iterable, List, Tuple
+from .types import Symbol
+
+# Classes de equivalência de símbolos: símbolo de entrada → rótulo da classe
+# usado no alfabeto do autômato
+SymbolClasses = Dict[str, Symbol]
+
+
+def _escape(char: str) -> str:
+    if char in "\\]-^":
+        return "\\" + char
+    if char.isprintable():
+        return char
+    return repr(char)[1:-1]
+
+
+def class_label(chars: Iterable[str]) -> Symbol:
+    """
+    Rótulo legível de uma classe de símbolos: o próprio símbolo quando a
+    classe é unitária, ou uma expressão com intervalos como [0-9_a-z].
+    """
+    ordered = sorted(set(chars))
+    if len(ordered) == 1:
+        return ordered[0]
+
+    ranges: List[Tuple[str, str]] = []
+    for char in ordered:
+        if ranges and ord(char) == ord(ranges[-1][1]) + 1:
+            ranges[-1] = (ranges[-1][0], char)
+        else:
+            ranges.append((char, char))
+
+    parts: List[str] = []
+    for start, end in ranges:
+        if start == end:
+            parts.append(_escape(start))
+        elif ord(end) == ord(start) + 1:
+            parts.append(_escape(start) + _escape(end))
+        else:
+            parts.append(f"{_escape(start)}-{_escape(end)}")
+    return "[" + "".join(parts) + "]"
@@ -0,0 +1,362 @@
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Set, Union
+from .compiled import DEAD
+from .constants import EPSILON
+from .types import Symbol, State
+
+if TYPE_CHECKING:
+    from .dfa import DFA
+    from .nfa import NFA
+
+
+class NameTable:
+    """Numeração de nomes (estados ou símbolos) em inteiros consecutivos."""
+
+    __slots__ = ("names", "index")
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        for name in names:
+            self.intern(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.index
+
+    def __getitem__(self, i: int) -> str:
+        return self.names[i]
+
+    def __repr__(self) -> str:
+        return f"NameTable({self.names})"
+
+    def get(self, name: str, default: int = DEAD) -> int:
+        return self.index.get(name, default)
+
+    def intern(self, name: str) -> int:
+        i = self.index.get(name)
+        if i is None:
+            i = self.index[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+
+class CompactDFA:
+    """
+    AFD com estados e símbolos numerados e a função de transição em um único
+    array de inteiros (estado × símbolo, DEAD para transição ausente). Mantém
+    a interface move/add_transition do DFA, traduzindo os nomes pela tabela
+    de nomes.
+    """
+
+    __slots__ = ("states", "symbols", "table", "accept", "initial")
+
+    def __init__(self) -> None:
+        self.states = NameTable()
+        self.symbols = NameTable()
+        self.table = array("i")
+        self.accept = bytearray()
+        self.initial = DEAD
+
+    def __repr__(self) -> str:
+        return f"CompactDFA(\n states={len(self.states)},\n alphabet={self.symbols.names},\n initial_state={self.initial_state},\n final_states={self.final_states}\n)"
+
+    @property
+    def initial_state(self) -> Union[State, None]:
+        return self.states[self.initial] if self.initial != DEAD else None
+
+    @initial_state.setter
+    def initial_state(self, state: Union[State, None]) -> None:
+        self.initial = self.add_state(state) if state is not None else DEAD
+
+    @property
+    def final_states(self) -> Set[State]:
+        return {self.states[i] for i, final in enumerate(self.accept) if final}
+
+    @property
+    def alphabet(self) -> Set[Symbol]:
+        return set(self.symbols)
+
+    def add_state(self, state: State, final: bool = False) -> int:
+        i = self.states.intern(state)
+        if i == len(self.accept):
+            self.table.extend(array("i", [DEAD]) * len(self.symbols))
+            self.accept.append(0)
+        if final:
+            self.accept[i] = 1
+        return i
+
+    def add_symbol(self, symbol: Symbol) -> int:
+        width = len(self.symbols)
+        c = self.symbols.intern(symbol)
+        if c == width and self.accept:
+            # Uma nova coluna: cada linha ganha uma entrada DEAD no final
+            table = array("i", [DEAD]) * (len(self.accept) * (width + 1))
+            for state in range(len(self.accept)):
+                table[state * (width + 1) : state * (width + 1) + width] = self.table[
+                    state * width : state * width + width
+                ]
+            self.table = table
+        return c
+
+    def add_transition(
+        self, state: State, symbol: Symbol, next_states: Set[State]
+    ) -> None:
+        if len(next_states) > 1:
+            raise Exception(
+                f"DFA next state must be a single state. For {state} -{symbol}-> Got: {next_states}"
+            )
+
+        source = self.add_state(state)
+        c = self.add_symbol(symbol)
+        for next_state in next_states:
+            self.table[source * len(self.symbols) + c] = self.add_state(next_state)
+
+    def step(self, state: int, c: int) -> int:
+        if state == DEAD or c == DEAD:
+            return DEAD
+        return self.table[state * len(self.symbols) + c]
+
+    def move(self, state: State, symbol: Symbol) -> Set[State]:
+        next_state = self.step(self.states.get(state), self.symbols.get(symbol))
+        return {self.states[next_state]} if next_state != DEAD else set()
+
+    def recognize_sentence(self, sentence: str) -> bool:
+        state = self.initial
+        width = len(self.symbols)
+        for symbol in sentence:
+            c = self.symbols.get(symbol)
+            if state == DEAD or c == DEAD:
+                return False
+            state = self.table[state * width + c]
+        return state != DEAD and self.accept[state] == 1
+
+    @classmethod
+    def from_dfa(cls, dfa: "DFA") -> "CompactDFA":
+        compact = cls()
+        for symbol in sorted(dfa.alphabet):
+            compact.add_symbol(symbol)
+        # Símbolos de uma classe são apelidos da coluna do rótulo da classe
+        for symbol, label in dfa.symbol_classes.items():
+            if label in compact.symbols:
+                compact.symbols.index.setdefault(symbol, compact.symbols.index[label])
+        for state in sorted(dfa.states, key=lambda state: (state != dfa.initial_state)):
+            compact.add_state(state, state in dfa.final_states)
+        compact.initial_state = dfa.initial_state
+
+        width = len(compact.symbols)
+        for state, transitions in dfa.transitions.items():
+            row = compact.states.index[state] * width
+            for symbol, next_states in transitions.items():
+                for next_state in next_states:
+                    compact.table[
+                        row + compact.symbols.index[symbol]
+                    ] = compact.states.index[next_state]
+        return compact
+
+    def to_dfa(self) -> "DFA":
+        from .dfa import DFA
+
+        dfa = DFA()
+        width = len(self.symbols)
+        dfa._transitions = {
+            self.states[state]: {
+                self.symbols[c]: (
+                    {self.states[self.table[state * width + c]]}
+                    if self.table[state * width + c] != DEAD
+                    else set()
+                )
+                for c in range(width)
+            }
+            for state in range(len(self.states))
+        }
+        dfa.initial_state = self.initial_state
+        dfa.final_states = self.final_states
+        dfa.symbol_classes = {
+            symbol: self.symbols[c]
+            for symbol, c in self.symbols.index.items()
+            if self.symbols[c] != symbol
+        }
+        return dfa.validate()
+
+
+class CompactNFA:
+    """
+    AFND com estados e símbolos numerados e os sucessores em formato CSR: os
+    destinos de (estado, símbolo) ficam em
+    targets[offsets[estado × |Σ| + símbolo] : offsets[estado × |Σ| + símbolo + 1]].
+    Transições adicionadas com add_transition ficam pendentes e são
+    incorporadas na próxima consulta.
+    """
+
+    __slots__ = (
+        "states",
+        "symbols",
+        "offsets",
+        "targets",
+        "accept",
+        "initial",
+        "_pending",
+        "_width",
+    )
+
+    def __init__(self) -> None:
+        self.states = NameTable()
+        self.symbols = NameTable()
+        self.offsets = array("i", [0])
+        self.targets = array("i")
+        self.accept = bytearray()
+        self.initial = DEAD
+        self._pending = array("i")
+        self._width = 0
+
+    def __repr__(self) -> str:
+        return f"CompactNFA(\n states={len(self.states)},\n alphabet={self.symbols.names},\n initial_state={self.initial_state},\n final_states={self.final_states}\n)"
+
+    @property
+    def initial_state(self) -> Union[State, None]:
+        return self.states[self.initial] if self.initial != DEAD else None
+
+    @initial_state.setter
+    def initial_state(self, state: Union[State, None]) -> None:
+        self.initial = self.add_state(state) if state is not None else DEAD
+
+    @property
+    def final_states(self) -> Set[State]:
+        return {self.states[i] for i, final in enumerate(self.accept) if final}
+
+    @property
+    def alphabet(self) -> Set[Symbol]:
+        return set(self.symbols)
+
+    def add_state(self, state: State, final: bool = False) -> int:
+        i = self.states.intern(state)
+        if i == len(self.accept):
+            self.accept.append(0)
+        if final:
+            self.accept[i] = 1
+        return i
+
+    def add_transition(
+        self, state: State, symbol: Symbol, next_states: Set[State]
+    ) -> None:
+        source = self.add_state(state)
+        c = self.symbols.intern(symbol)
+        for next_state in next_states:
+            self._pending.extend((source, c, self.add_state(next_state)))
+
+    def _freeze(self) -> None:
+        # Reconstrói o CSR quando há transições pendentes ou quando estados e
+        # símbolos novos mudaram as dimensões da tabela
+        width = len(self.symbols)
+        cells = len(self.states) * width
+        if (
+            not self._pending
+            and self._width == width
+            and len(self.offsets) == cells + 1
+        ):
+            return
+
+        buckets: Dict[int, Set[int]] = {}
+        for cell in range(len(self.offsets) - 1):
+            start, end = self.offsets[cell], self.offsets[cell + 1]
+            if start != end:
+                state, c = divmod(cell, self._width)
+                buckets[state * width + c] = set(self.targets[start:end])
+        pending = self._pending
+        for i in range(0, len(pending), 3):
+            buckets.setdefault(pending[i] * width + pending[i + 1], set()).add(
+                pending[i + 2]
+            )
+
+        offsets = array("i", [0]) * (cells + 1)
+        targets = array("i")
+        for cell in range(cells):
+            targets.extend(sorted(buckets.get(cell, ())))
+            offsets[cell + 1] = len(targets)
+
+        self.offsets = offsets
+        self.targets = targets
+        self._pending = array("i")
+        self._width = width
+
+    def successors(self, state: int, c: int) -> array:
+        self._freeze()
+        cell = state * len(self.symbols) + c
+        return self.targets[self.offsets[cell] : self.offsets[cell + 1]]
+
+    def move(self, state: State, symbol: Symbol) -> Set[State]:
+        source = self.states.get(state)
+        c = self.symbols.get(symbol)
+        if source == DEAD or c == DEAD:
+            return set()
+        return {self.states[i] for i in self.successors(source, c)}
+
+    def _epsilon_closure(self, states: Iterable[int]) -> Set[int]:
+        closure = set(states)
+        epsilon = self.symbols.get(EPSILON)
+        if epsilon == DEAD:
+            return closure
+
+        queue = list(closure)
+        while queue:
+            for next_state in self.successors(queue.pop(), epsilon):
+                if next_state not in closure:
+                    closure.add(next_state)
+                    queue.append(next_state)
+        return closure
+
+    def recognize_sentence(self, sentence: str) -> bool:
+        if self.initial == DEAD:
+            return False
+
+        current = self._epsilon_closure((self.initial,))
+        for symbol in sentence:
+            c = self.symbols.get(symbol)
+            if c == DEAD:
+                return False
+            current = self._epsilon_closure(
+                next_state
+                for state in current
+                for next_state in self.successors(state, c)
+            )
+            if not current:
+                return False
+        return any(self.accept[state] for state in current)
+
+    @classmethod
+    def from_nfa(cls, nfa: "NFA") -> "CompactNFA":
+        compact = cls()
+        for symbol in sorted(nfa.alphabet):
+            compact.symbols.intern(symbol)
+        for state in sorted(nfa.states, key=lambda state: (state != nfa.initial_state)):
+            compact.add_state(state, state in nfa.final_states)
+        compact.initial_state = nfa.initial_state
+
+        for state, transitions in nfa.transitions.items():
+            for symbol, next_states in transitions.items():
+                compact.add_transition(state, symbol, next_states)
+        compact._freeze()
+        return compact
+
+    def to_nfa(self) -> "NFA":
+        from .nfa import NFA
+
+        nfa = NFA()
+        nfa._transitions = {
+            self.states[state]: {
+                self.symbols[c]: {
+                    self.states[next_state] for next_state in self.successors(state, c)
+                }
+                for c in range(len(self.symbols))
+            }
+            for state in range(len(self.states))
+        }
+        nfa.initial_state = self.initial_state
+        nfa.final_states = self.final_states
+        return nfa.validate()
@@ -0,0 +1,202 @@
+from array import array
+from typing import Dict, Iterable, List, Sequence, Set, Union
+from .types import Symbol, State, Transitions
+from .classes import SymbolClasses
+
+# Marca de transição inexistente (estado morto) na tabela compilada
+DEAD = -1
+
+
+class CompiledDFA:
+    """
+    Forma congelada de um AFD: estados e símbolos numerados, com a função de
+    transição em uma tabela densa (estado × símbolo) e os estados finais em um
+    mapa de bits. O dicionário de transições do AFD continua sendo a fonte
+    editável; esta forma é usada apenas para reconhecimento.
+    """
+
+    __slots__ = (
+        "states",
+        "symbols",
+        "symbol_index",
+        "table",
+        "accept",
+        "initial",
+        "_byte_table",
+    )
+
+    def __init__(
+        self,
+        transitions: Transitions,
+        initial_state: Union[State, None],
+        final_states: Set[State],
+        symbol_classes: Union[SymbolClasses, None] = None,
+    ) -> None:
+        self.states: List[State] = sorted(
+            transitions.keys(), key=lambda state: (state != initial_state, state)
+        )
+        self.symbols: List[Symbol] = sorted(
+            {symbol for symbols in transitions.values() for symbol in symbols}
+        )
+
+        state_index: Dict[State, int] = {
+            state: i for i, state in enumerate(self.states)
+        }
+        self.symbol_index: Dict[Symbol, int] = {
+            symbol: i for i, symbol in enumerate(self.symbols)
+        }
+
+        # Símbolos de uma classe usam a coluna do rótulo da classe. Texto é
+        # mapeado por este dicionário e não por uma tabela densa indexada por
+        # ord(): em CPython, dict.get de um caractere é mais rápido que ord()
+        # seguido do acesso a um array. A tabela densa de 256 entradas por
+        # byte fica em byte_table, usada para entradas em bytes.
+        for symbol, label in (symbol_classes or {}).items():
+            if label in self.symbol_index:
+                self.symbol_index.setdefault(symbol, self.symbol_index[label])
+
+        width = len(self.symbols)
+        self.table = array("l", [DEAD]) * (len(self.states) * width)
+        for state, symbols in transitions.items():
+            row = state_index[state] * width
+            for symbol, next_states in symbols.items():
+                for next_state in next_states:
+                    self.table[row + self.symbol_index[symbol]] = state_index[
+                        next_state
+                    ]
+
+        self.accept = bytearray(len(self.states))
+        for state in final_states:
+            if state in state_index:
+                self.accept[state_index[state]] = 1
+
+        self.initial: int = state_index.get(initial_state, DEAD)  # type: ignore
+        self._byte_table: Union[array, None] = None
+
+    @classmethod
+    def from_tables(
+        cls,
+        states: List[State],
+        symbols: List[Symbol],
+        symbol_index: Dict[Symbol, int],
+        table: Sequence[int],
+        accept: Sequence[int],
+        initial: int,
+    ) -> "CompiledDFA":
+        """
+        Monta a forma compilada diretamente a partir das tabelas, por exemplo
+        memoryviews sobre um arquivo de cache
+        """
+        compiled = cls.__new__(cls)
+        compiled.states = states
+        compiled.symbols = symbols
+        compiled.symbol_index = symbol_index
+        compiled.table = table
+        compiled.accept = accept
+        compiled.initial = initial
+        compiled._byte_table = None
+        return compiled
+
+    def step(self, state: int, symbol: Symbol) -> int:
+        column = self.symbol_index.get(symbol)
+        if state == DEAD or column is None:
+            return DEAD
+        return self.table[state * len(self.symbols) + column]
+
+    def match(self, sentence: str) -> bool:
+        state = self.initial
+        if state == DEAD:
+            return False
+
+        table = self.table
+        symbol_index = self.symbol_index
+        width = len(self.symbols)
+        for symbol in sentence:
+            column = symbol_index.get(symbol)
+            if column is None:
+                return False
+            state = table[state * width + column]
+            if state == DEAD:
+                return False
+        return self.accept[state] == 1
+
+    def byte_table(self) -> array:
+        """
+        Tabela (estado × 256) indexada diretamente pelos bytes da entrada,
+        cada byte lido como o símbolo latin-1 de mesmo código
+        """
+        if self._byte_table is None:
+            width = len(self.symbols)
+            columns = [self.symbol_index.get(chr(byte), DEAD) for byte in range(256)]
+            table = array("l", [DEAD]) * (len(self.states) * 256)
+            for state in range(len(self.states)):
+                for byte, column in enumerate(columns):
+                    if column != DEAD:
+                        table[state * 256 + byte] = self.table[state * width + column]
+            self._byte_table = table
+        return self._byte_table
+
+    def match_bytes(self, data) -> bool:
+        """Recognize a bytes-like input (bytes, mmap, memoryview) without decoding"""
+        state = self.initial
+        if state == DEAD:
+            return False
+
+        table = self.byte_table()
+        for byte in memoryview(data).cast("B"):
+            state = table[state * 256 + byte]
+            if state == DEAD:
+                return False
+        return self.accept[state] == 1
+
+    def longest_match(self, sentence: str, start: int = 0) -> int:
+        """Fim do maior prefixo aceito de sentence[start:], ou DEAD"""
+        state = self.initial
+        if state == DEAD:
+            return DEAD
+
+        table = self.table
+        accept = self.accept
+        symbol_index = self.symbol_index
+        width = len(self.symbols)
+        end = start if accept[state] == 1 else DEAD
+        for position in range(start, len(sentence)):
+            column = symbol_index.get(sentence[position])
+            if column is None:
+                break
+            state = table[state * width + column]
+            if state == DEAD:
+                break
+            if accept[state] == 1:
+                end = position + 1
+        return end
+
+    def match_many(self, sentences: Iterable[str]) -> List[bool]:
+        sentences = list(sentences)
+        state = self.initial
+        if state == DEAD:
+            return [False] * len(sentences)
+
+        table = self.table
+        accept = self.accept
+        symbol_index = self.symbol_index
+        width = len(self.symbols)
+
+        # Sentenças repetidas são avaliadas uma única vez
+        results: Dict[str, bool] = {}
+        for sentence in sentences:
+            if sentence in results:
+                continue
+
+            state = self.initial
+            for symbol in sentence:
+                column = symbol_index.get(symbol)
+                if column is None:
+                    state = DEAD
+                    break
+                state = table[state * width + column]
+                if state == DEAD:
+                    break
+            results[sentence] = state != DEAD and accept[state] == 1
+
+        return [results[sentence] for sentence in sentences]
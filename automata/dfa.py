@@ -1,8 +1,23 @@
+from array import array
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    Tuple,
+    Union,
+)
 from .constants import *
 from .types import *
 from .automaton import Automaton
+from .compiled import CompiledDFA, DEAD
+from .compact import CompactDFA
+from .classes import SymbolClasses, class_label
 from re_to_dfa.operators import *
-from re_to_dfa.node import Node
+from re_to_dfa.syntaxtree import bits
 from tabulate import tabulate
 
 
@@ -10,6 +25,19 @@ class DFA(Automaton):
     def __init__(self) -> None:
         super().__init__()
 
+        # Quando o alfabeto é formado por classes de símbolos, cada símbolo de
+        # entrada é traduzido para o rótulo da sua classe no reconhecimento
+        self._symbol_classes: SymbolClasses = {}
+
+    @property
+    def symbol_classes(self) -> SymbolClasses:
+        return self._symbol_classes
+
+    @symbol_classes.setter
+    def symbol_classes(self, symbol_classes: SymbolClasses) -> None:
+        self._invalidate()
+        self._symbol_classes = symbol_classes
+
     def __str__(self):
         symbols = sorted(self.alphabet)
         states = sorted(self.states, key=lambda state: (state != self.initial_state))
@@ -51,199 +79,505 @@ class DFA(Automaton):
 
     # (c) Minimização de AFD
     def minimize(self):
+        self._complete_transitions()
         self._remove_unreachable_states()
         self._remove_dead_states()
 
-        # Usando o algoritmo de Hopcroft
-        P = [self.final_states, self.states - self.final_states]
-        W = [self.final_states, self.states - self.final_states]
-        while W:
-            A = W.pop()
-            for c in self.alphabet:
-                X = {state for state in self.states if self.transitions[state][c] & A}
-                for Y in P:
-                    if X & Y and Y - X:
-                        P.remove(Y)
-                        P.append(X & Y)
-                        P.append(Y - X)
-                        if Y in W:
-                            W.remove(Y)
-                            W.append(X & Y)
-                            W.append(Y - X)
-                        else:
-                            if len(X & Y) <= len(Y - X):
-                                W.append(X & Y)
-                            else:
-                                W.append(Y - X)
-
-        state_to_group = {}
-        for group in P:
-            for state in group:
-                state_to_group[state] = str(group)
-
-        self.initial_state = state_to_group[self.initial_state]
-        self.final_states = {state_to_group[state] for state in self.final_states}
-        self._transitions = {
-            state_to_group[state]: {
-                symbol: {state_to_group[list(next_state)[0]]}
-                for symbol, next_state in transitions.items()
+        # Usando o algoritmo de Hopcroft, com os estados numerados e um estado
+        # sumidouro (o último) no lugar das transições ausentes
+        symbols = sorted(self.alphabet)
+        states = sorted(self.states, key=lambda state: (state != self.initial_state))
+        state_index = {state: i for i, state in enumerate(states)}
+        sink = len(states)
+
+        delta: List[List[int]] = []
+        for state in states:
+            row: List[int] = []
+            for symbol in symbols:
+                next_state = self.move(state, symbol)
+                row.append(state_index[next(iter(next_state))] if next_state else sink)
+            delta.append(row)
+        delta.append([sink] * len(symbols))
+
+        inverse: List[List[List[int]]] = [
+            [[] for _ in range(sink + 1)] for _ in symbols
+        ]
+        for state, row in enumerate(delta):
+            for c, next_state in enumerate(row):
+                inverse[c][next_state].append(state)
+
+        final = [i for i, state in enumerate(states) if state in self.final_states]
+        non_final = [
+            i for i, state in enumerate(states) if state not in self.final_states
+        ]
+        non_final.append(sink)
+
+        blocks: List[Set[int]] = [set(group) for group in (final, non_final) if group]
+        block_of = [0] * (sink + 1)
+        for block_id, block in enumerate(blocks):
+            for state in block:
+                block_of[state] = block_id
+
+        waiting: Set[int] = {min(range(len(blocks)), key=lambda b: len(blocks[b]))}
+        waiting_order = list(waiting)
+        while waiting_order:
+            splitter_id = waiting_order.pop()
+            waiting.discard(splitter_id)
+            splitter = list(blocks[splitter_id])
+
+            for c in range(len(symbols)):
+                touched: Dict[int, Set[int]] = {}
+                for next_state in splitter:
+                    for state in inverse[c][next_state]:
+                        touched.setdefault(block_of[state], set()).add(state)
+
+                for block_id, inside in touched.items():
+                    block = blocks[block_id]
+                    if len(inside) == len(block):
+                        continue
+
+                    block -= inside
+                    new_block_id = len(blocks)
+                    blocks.append(inside)
+                    for state in inside:
+                        block_of[state] = new_block_id
+
+                    if block_id in waiting or len(inside) <= len(block):
+                        waiting.add(new_block_id)
+                        waiting_order.append(new_block_id)
+                    else:
+                        waiting.add(block_id)
+                        waiting_order.append(block_id)
+
+        names: List[State] = []
+        for block in blocks:
+            members = sorted(states[state] for state in block if state != sink)
+            names.append(members[0] if len(members) == 1 else self._group_name(members))
+
+        # O bloco do sumidouro só é mantido quando contém o estado inicial, ou
+        # seja, quando a linguagem reconhecida é vazia
+        dead_block = block_of[sink]
+        initial_block = block_of[0] if self.initial_state is not None else None
+
+        transitions: Transitions = {}
+        for block_id, block in enumerate(blocks):
+            if block_id == dead_block and block_id != initial_block:
+                continue
+            row = delta[min(block)]
+            transitions[names[block_id]] = {
+                symbol: (
+                    {names[block_of[row[c]]]}
+                    if block_of[row[c]] != dead_block
+                    else set()
+                )
+                for c, symbol in enumerate(symbols)
             }
-            for state, transitions in self.transitions.items()
-        }
+
+        self.initial_state = names[initial_block] if initial_block is not None else None
+        self.final_states = {names[block_of[state]] for state in final}
+        self._transitions = transitions
 
         return self.validate()
 
+    def _group_name(self, states: List[State]) -> State:
+        return "{" + ", ".join(states) + "}"
+
     def _remove_unreachable_states(self):
-        reachable_states: Set[State] = set(
-            list(next_state)[0]
-            for next_states in self.transitions.values()
-            for next_state in next_states.values()
-            if next_state
-        )
-        if self.initial_state:
+        reachable_states: Set[State] = set()
+        if self.initial_state is not None:
             reachable_states.add(self.initial_state)
 
-        self._transitions = {
-            state: transition
-            for state, transition in self.transitions.items()
-            if state in reachable_states
-        }
+        queue = list(reachable_states)
+        while queue:
+            state = queue.pop()
+            for next_states in self.transitions.get(state, {}).values():
+                for next_state in next_states:
+                    if next_state not in reachable_states:
+                        reachable_states.add(next_state)
+                        queue.append(next_state)
+
+        self._keep_states(reachable_states)
 
     def _remove_dead_states(self):
-        uncheked_states = self.final_states.copy()
-        alive_states = self.final_states.copy()
+        predecessors: Dict[State, Set[State]] = {}
+        for state, transitions in self.transitions.items():
+            for next_states in transitions.values():
+                for next_state in next_states:
+                    predecessors.setdefault(next_state, set()).add(state)
 
+        alive_states = self.final_states & self.states
+        uncheked_states = list(alive_states)
         while uncheked_states:
-            final_state = uncheked_states.pop()
-            for state in self.states:
-                for _, next_state in self.transitions[state].items():
-                    if (
-                        next_state
-                        and final_state == list(next_state)[0]
-                        and state not in alive_states
-                    ):
-                        uncheked_states.add(state)
-                        alive_states.add(state)
+            state = uncheked_states.pop()
+            for previous_state in predecessors.get(state, ()):
+                if previous_state not in alive_states:
+                    alive_states.add(previous_state)
+                    uncheked_states.append(previous_state)
+
+        # O estado inicial é mantido mesmo que não alcance um estado final
+        if self.initial_state in self.states:
+            alive_states.add(self.initial_state)
 
+        self._keep_states(alive_states)
+
+    def _keep_states(self, states: Set[State]):
+        self.final_states = {state for state in self.final_states if state in states}
         self._transitions = {
-            state: transitions
+            state: {
+                symbol: next_states & states
+                for symbol, next_states in transitions.items()
+            }
             for state, transitions in self.transitions.items()
-            if state in alive_states
+            if state in states
         }
 
-    # (d.1) União de AFD
-    def union(self, automata: "DFA"):
-        from .nfa import NFA
-
-        union_nfa = NFA()
-        new_start_state = "q0"
-        union_nfa.initial_state = new_start_state
-
-        self.replace_states("p")
-        if self.initial_state is not None:
-            union_nfa.add_transition(new_start_state, EPSILON, {self.initial_state})
-        for transition in self.transitions:
-            union_nfa.transitions[transition] = self.transitions[transition]
-
-        automata.replace_states("r")
-        if automata.initial_state is not None:
-            union_nfa.add_transition(new_start_state, EPSILON, {automata.initial_state})
-        for transition in automata.transitions:
-            union_nfa.transitions[transition] = automata.transitions[transition]
+    # Construção do produto de dois AFD, explorando apenas os pares (p, q)
+    # alcançáveis. O par é final quando accept(p é final, q é final).
+    def product(self, automata: "DFA", accept: Callable[[bool, bool], bool]) -> "DFA":
+        first = self.compile()
+        second = automata.compile()
+
+        # Os símbolos de entrada são agrupados pelo par de colunas que usam nos
+        # dois AFD, o que refina as classes de símbolos de ambos os lados
+        inputs: Set[Symbol] = set()
+        for dfa, compiled in ((self, first), (automata, second)):
+            labels = set(dfa.symbol_classes.values())
+            inputs.update(symbol for symbol in compiled.symbols if symbol not in labels)
+            inputs.update(dfa.symbol_classes)
+        groups: Dict[Tuple[Union[int, None], Union[int, None]], Set[Symbol]] = {}
+        for symbol in inputs:
+            groups.setdefault(
+                (first.symbol_index.get(symbol), second.symbol_index.get(symbol)),
+                set(),
+            ).add(symbol)
+        columns: Dict[Symbol, Tuple[Union[int, None], Union[int, None]]] = {}
+        symbol_classes: SymbolClasses = {}
+        for signature, group in groups.items():
+            label = class_label(group)
+            columns[label] = signature
+            if len(group) > 1:
+                symbol_classes.update((symbol, label) for symbol in group)
+
+        symbols = sorted(columns)
+        first_columns = [columns[symbol][0] for symbol in symbols]
+        second_columns = [columns[symbol][1] for symbol in symbols]
+        first_width = len(first.symbols)
+        second_width = len(second.symbols)
+
+        # Um lado morto (DEAD) nunca volta a viver e nunca aceita; o par só é
+        # descartado quando todo resultado que ainda pode alcançar é rejeitado
+        keep_both_dead = accept(False, False)
+        keep_first_dead = keep_both_dead or accept(False, True)
+        keep_second_dead = keep_both_dead or accept(True, False)
+
+        def alive(pair: Tuple[int, int]) -> bool:
+            p, q = pair
+            if p == DEAD:
+                return keep_both_dead if q == DEAD else keep_first_dead
+            return q != DEAD or keep_second_dead
+
+        product = DFA()
+        initial = (first.initial, second.initial)
+        if not alive(initial):
+            return product
+
+        pairs: Dict[Tuple[int, int], Dict[Symbol, Tuple[int, int]]] = {}
+        queue = [initial]
+        while queue:
+            pair = queue.pop()
+            if pair in pairs:
+                continue
+            p, q = pair
+
+            moves: Dict[Symbol, Tuple[int, int]] = {}
+            for symbol, first_column, second_column in zip(
+                symbols, first_columns, second_columns
+            ):
+                next_pair = (
+                    first.table[p * first_width + first_column]
+                    if p != DEAD and first_column is not None
+                    else DEAD,
+                    second.table[q * second_width + second_column]
+                    if q != DEAD and second_column is not None
+                    else DEAD,
+                )
+                if alive(next_pair):
+                    moves[symbol] = next_pair
+                    if next_pair not in pairs:
+                        queue.append(next_pair)
+            pairs[pair] = moves
+
+        def name(pair: Tuple[int, int]) -> State:
+            p, q = pair
+            return "({}, {})".format(
+                first.states[p] if p != DEAD else "∅",
+                second.states[q] if q != DEAD else "∅",
+            )
+
+        names = {pair: name(pair) for pair in pairs}
+        product.initial_state = names[initial]
+        product.final_states = {
+            names[(p, q)]
+            for p, q in pairs
+            if accept(
+                p != DEAD and first.accept[p] == 1, q != DEAD and second.accept[q] == 1
+            )
+        }
+        product._transitions = {
+            names[pair]: {
+                symbol: {names[moves[symbol]]} if symbol in moves else set()
+                for symbol in symbols
+            }
+            for pair, moves in pairs.items()
+        }
+        product.symbol_classes = symbol_classes
 
-        union_nfa.final_states = self.final_states.union(automata.final_states)
+        return product.validate()
 
-        return union_nfa.validate()
+    # (d.1) União de AFD
+    def union(self, automata: "DFA"):
+        return self.product(automata, lambda p, q: p or q)
 
-    # (d.2) Interseção de AFD
+    # (d.2) Interseção de AFD
     def intersection(self, automata: "DFA"):
-        # Feito com base na lei de Morgan
-        # L1 ∩ L2 = (L1' ∪ L2')'
-        # A interseção de dois conjuntos é igual ao complemento da união dos complementos dos conjuntos
-        first_automata_complement = self.complement()
-        second_automata_complement = automata.complement()
-
-        union_of_complements = first_automata_complement.union(
-            second_automata_complement
-        ).to_dfa()
+        return self.product(automata, lambda p, q: p and q)
 
-        intersected_dfa = union_of_complements.complement().validate()
+    # (e) Diferença de AFD
+    def difference(self, automata: "DFA"):
+        return self.product(automata, lambda p, q: p and not q)
 
-        return intersected_dfa
+    def symmetric_difference(self, automata: "DFA"):
+        return self.product(automata, lambda p, q: p != q)
 
     def complement(self):
         complemented_dfa = DFA()
         complemented_dfa.initial_state = self.initial_state
         complemented_dfa.final_states = self.states - self.final_states
         complemented_dfa._transitions = self.transitions
+        complemented_dfa.symbol_classes = self.symbol_classes
 
         return complemented_dfa
 
-    # (e) Diferença de AFD
     def from_syntax_tree(self, tree):
-        dstates = [frozenset(tree.root.firstpos)]
-        vis = set()
-        statename = {}
+        self._from_syntax_tree(tree)
+        return self
+
+    # Constrói o AFD pelo followpos da árvore e devolve, para cada estado
+    # final, o menor padrão cujo marcador de fim o estado contém
+    def _from_syntax_tree(self, tree) -> Dict[State, int]:
+        firstpos = bits(tree.firstpos)
+        followpos = {}
+
+        # Posições alcançáveis a partir da raiz
+        positions: Set[int] = set(firstpos)
+        queue = list(firstpos)
+        while queue:
+            position = queue.pop()
+            followpos[position] = tree.followpos(position)
+            for next_position in followpos[position]:
+                if next_position not in positions:
+                    positions.add(next_position)
+                    queue.append(next_position)
+
+        # Posições que aparecem sempre juntas e têm o mesmo followpos (como os
+        # ramos de uma alternação de caracteres) são fundidas em uma só
+        occurrences: Dict[int, List[int]] = {position: [] for position in positions}
+        for i, group in enumerate(
+            [firstpos] + [followpos[p] for p in sorted(positions)]
+        ):
+            for position in group:
+                occurrences[position].append(i)
+
+        merged: Dict[
+            Tuple[Union[int, None], Tuple[int, ...], Tuple[int, ...]], int
+        ] = {}
+        merged_of: Dict[int, int] = {}
+        for position in sorted(positions):
+            key = (
+                marked_pattern(tree.nodelist[position].v),
+                tuple(followpos[position]),
+                tuple(occurrences[position]),
+            )
+            merged_of[position] = merged.setdefault(key, len(merged))
+
+        chars: List[Set[str]] = [set() for _ in merged]
+        follow: List[FrozenSet[int]] = [frozenset() for _ in merged]
+        end_patterns: Dict[int, int] = {}
+        for position in positions:
+            node = tree.nodelist[position]
+            m = merged_of[position]
+            follow[m] = frozenset(merged_of[p] for p in followpos[position])
+            if marked_pattern(node.v) is not None:
+                end_patterns[m] = marked_pattern(node.v)
+            elif isinstance(node.v, int):
+                chars[m].add(chr(node.v))
+            else:
+                chars[m].update(node.v)
+
+        # Classes de equivalência: símbolos aceitos exatamente pelas mesmas
+        # posições não podem ser distinguidos por nenhuma transição
+        signature: Dict[str, Set[int]] = {}
+        for m, position_chars in enumerate(chars):
+            for char in position_chars:
+                signature.setdefault(char, set()).add(m)
+        classes: Dict[FrozenSet[int], Set[str]] = {}
+        for char, members in signature.items():
+            classes.setdefault(frozenset(members), set()).add(char)
+
+        labels: Dict[FrozenSet[int], Symbol] = {
+            members: class_label(class_chars)
+            for members, class_chars in classes.items()
+        }
+        classes_of: List[List[FrozenSet[int]]] = [[] for _ in merged]
+        for members in sorted(classes, key=lambda members: min(classes[members])):
+            for m in members:
+                classes_of[m].append(members)
+
+        start = frozenset(merged_of[p] for p in firstpos)
+        dstates = [start]
+        statename: Dict[FrozenSet[int], State] = {}
+        dtran: Dict[FrozenSet[int], Dict[Symbol, FrozenSet[int]]] = {}
         while dstates:
             state = dstates.pop()
-            if state in vis:
+            if state in statename:
                 continue
-            vis.add(state)
-            statename.setdefault(state, f"q{len(statename)}")
-            if any(Node.nodelist[i].v == SIMBOLS["#"] for i in state):
-                self.final_states.add(state)
-            for a in tree.symbols:
-                z = set()
-                for i in state:
-                    node = Node.nodelist[i]
-                    if node.v == a:
-                        z |= node.followpos
-                if len(z):
-                    z = frozenset(z)
-                    dstates.append(z)
-                    self._transitions.setdefault(state, {})
-                    if chr(a) not in OPSMB:
-                        self._transitions[state][a] = z
-                    else:
-                        del self._transitions[state]
-
-        initial_state = set()
-        initial_state.add("q0")
-        f_states = {statename[i] for i in self.final_states}
-
-        transit = {
-            statename[k1]: {
-                chr(k2): statename[self._transitions[k1][k2]]
-                for k2 in self._transitions[k1]
+            statename[state] = f"q{len(statename)}"
+
+            moves: Dict[FrozenSet[int], Set[int]] = {}
+            for m in state:
+                for members in classes_of[m]:
+                    moves.setdefault(members, set()).update(follow[m])
+            dtran[state] = {}
+            for members in sorted(moves, key=lambda members: min(classes[members])):
+                next_state = frozenset(moves[members])
+                dtran[state][labels[members]] = next_state
+                if next_state not in statename:
+                    dstates.append(next_state)
+
+        alphabet = sorted(labels.values())
+        self._transitions = {
+            statename[state]: {
+                symbol: {statename[moves[symbol]]} if symbol in moves else set()
+                for symbol in alphabet
             }
-            for k1 in self._transitions
+            for state, moves in dtran.items()
+        }
+        patterns: Dict[State, int] = {}
+        for state in dtran:
+            ends = [end_patterns[m] for m in state if m in end_patterns]
+            if ends:
+                patterns[statename[state]] = min(ends)
+        self.initial_state = statename[start]
+        self.final_states = set(patterns)
+        self.symbol_classes = {
+            char: labels[members]
+            for members, class_chars in classes.items()
+            if len(class_chars) > 1
+            for char in class_chars
         }
-        for item in transit:
-            for symbol in self.alphabet:
-                set_value = set()
-                value = transit[item][chr(symbol)]
-                set_value.add(value)
-                transit[item][chr(symbol)] = set_value
-
-        self._transitions = transit
-        self.initial_state = "q0"
-        self.final_states = f_states
 
-        return self
+        return patterns
+
+    def compile(self) -> CompiledDFA:
+        if "compiled" not in self._cache:
+            self._complete_transitions()
+            self._cache["compiled"] = CompiledDFA(
+                self.transitions,
+                self.initial_state,
+                self.final_states,
+                self.symbol_classes,
+            )
+        return self._cache["compiled"]
+
+    def search(self, text: str, pos: int = 0) -> Union[Tuple[int, int], None]:
+        return next(self.finditer(text, pos), None)
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[Tuple[int, int]]:
+        """
+        Non-overlapping leftmost-longest matches in text[pos:], as
+        (start, end) spans. One right-to-left pass marks every position where
+        a match starts; each match is then the longest one from the leftmost
+        start not yet consumed.
+        """
+        compiled = self.compile()
+        reverse, reverse_accept = self._reverse_table()
+        symbol_index = compiled.symbol_index
+        width = len(compiled.symbols)
+
+        # Símbolos fora do alfabeto não continuam nenhuma sentença: o AFD
+        # reverso volta ao estado inicial
+        starts = bytearray(len(text) + 1)
+        state = 0
+        starts[len(text)] = reverse_accept[state]
+        for i in range(len(text) - 1, pos - 1, -1):
+            column = symbol_index.get(text[i])
+            state = reverse[state * width + column] if column is not None else 0
+            starts[i] = reverse_accept[state]
+
+        start = pos
+        while True:
+            start = starts.find(1, start)
+            if start == -1:
+                return
+            end = compiled.longest_match(text, start)
+            yield start, end
+            start = end if end > start else end + 1
+
+    # AFD que lê a entrada da direita para a esquerda e reconhece Σ*·reverso(L),
+    # construído por subconjuntos sobre a tabela compilada. O estado 0 é o
+    # inicial e um estado é final quando contém o estado inicial do AFD, ou
+    # seja, quando alguma sentença começa na posição lida.
+    def _reverse_table(self) -> Tuple[array, bytearray]:
+        if "reverse" not in self._cache:
+            compiled = self.compile()
+            width = len(compiled.symbols)
+
+            predecessors: List[Dict[int, List[int]]] = [{} for _ in range(width)]
+            for state in range(len(compiled.states)):
+                for c in range(width):
+                    next_state = compiled.table[state * width + c]
+                    if next_state != DEAD:
+                        predecessors[c].setdefault(next_state, []).append(state)
+
+            final = frozenset(
+                state
+                for state in range(len(compiled.states))
+                if compiled.accept[state] == 1
+            )
+            subsets: Dict[FrozenSet[int], int] = {final: 0}
+            order = [final]
+            table = array("l")
+            accept = bytearray()
+            for subset in order:
+                accept.append(compiled.initial in subset)
+                for c in range(width):
+                    next_subset = set(final)
+                    for state in subset:
+                        next_subset.update(predecessors[c].get(state, ()))
+                    next_subset = frozenset(next_subset)
+                    if next_subset not in subsets:
+                        subsets[next_subset] = len(order)
+                        order.append(next_subset)
+                    table.append(subsets[next_subset])
+
+            self._cache["reverse"] = (table, accept)
+        return self._cache["reverse"]
+
+    def to_compact(self) -> CompactDFA:
+        return CompactDFA.from_dfa(self)
 
     def recognize_sentence(self, sentence: str) -> bool:
-        if self.initial_state is None:
-            return False
+        if not isinstance(sentence, str):
+            return self.compile().match_bytes(sentence)
+        return self.compile().match(sentence)
 
-        current_state = self.initial_state
-        for symbol in sentence:
-            current_state = list(self.move(current_state, symbol))[0]
-            if not current_state:
-                return False
-        return current_state in self.final_states
+    def recognize_many(self, sentences: Iterable[str]) -> List[bool]:
+        return self.compile().match_many(sentences)
 
     def validate(self):
-        super()._complete_transitions()
+        if self._defer_validation():
+            return self
+
         for state, transitions in self.transitions.items():
             for symbol, next_states in transitions.items():
                 if len(next_states) > 1:
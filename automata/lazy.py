@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Union
+from .constants import EPSILON
+from .types import Symbol
+
+if TYPE_CHECKING:
+    from .nfa import NFA
+
+# Quantidade padrão de estados do AFD mantidos em cache
+LAZY_CACHE_SIZE = 1024
+
+# Mínimo de símbolos consumidos por estado construído antes de o cache ser
+# considerado ineficiente (mesmo critério usado pelo RE2)
+MIN_PROGRESS = 10
+
+Subset = FrozenSet[int]
+
+
+class LazyDFA:
+    """
+    Simulação do AFND que constrói os estados do AFD equivalente apenas
+    quando a entrada chega neles. Os estados construídos ficam em um cache
+    LRU limitado a `max_states`; quando o cache é descartado com frequência
+    demais, a sentença segue sendo reconhecida pela simulação direta sobre
+    conjuntos de estados, sem cache. O tempo é sempre linear no tamanho da
+    entrada e a memória é limitada por `max_states`.
+    """
+
+    __slots__ = ("max_states", "evictions", "_start", "_final", "_moves", "_cache")
+
+    def __init__(self, nfa: "NFA", max_states: int = LAZY_CACHE_SIZE) -> None:
+        if max_states < 1:
+            raise Exception("Lazy DFA cache must hold at least one state.")
+
+        self.max_states = max_states
+        self.evictions = 0
+
+        states = sorted(nfa.states)
+        state_index = {state: i for i, state in enumerate(states)}
+        epsilon_closures = nfa.epsilon_closures()
+        closures = [
+            frozenset(
+                state_index[next_state]
+                for next_state in epsilon_closures.get(state, {state})
+            )
+            for state in states
+        ]
+
+        self._moves: List[Dict[Symbol, Subset]] = []
+        for state in states:
+            moves: Dict[Symbol, Subset] = {}
+            for symbol, next_states in nfa.transitions[state].items():
+                if symbol == EPSILON or not next_states:
+                    continue
+                moves[symbol] = frozenset().union(
+                    *(closures[state_index[next_state]] for next_state in next_states)
+                )
+            self._moves.append(moves)
+
+        self._start: Union[Subset, None] = (
+            closures[state_index[nfa.initial_state]]
+            if nfa.initial_state in state_index
+            else None
+        )
+        self._final: Subset = frozenset(
+            state_index[state] for state in nfa.final_states if state in state_index
+        )
+        self._cache: "OrderedDict[Subset, Dict[Symbol, Subset]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _step(self, current: Subset, symbol: Symbol) -> Subset:
+        next_states = set()
+        for state in current:
+            next_states.update(self._moves[state].get(symbol, ()))
+        return frozenset(next_states)
+
+    def _row(self, subset: Subset) -> Dict[Symbol, Subset]:
+        row = self._cache.get(subset)
+        if row is not None:
+            self._cache.move_to_end(subset)
+            return row
+
+        row = self._cache[subset] = {}
+        if len(self._cache) > self.max_states:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return row
+
+    def match(self, sentence: str) -> bool:
+        current = self._start
+        if current is None:
+            return False
+
+        evictions = self.evictions
+        built = 0
+        simulate = False
+        for position, symbol in enumerate(sentence):
+            if simulate:
+                current = self._step(current, symbol)
+            else:
+                row = self._row(current)
+                next_states = row.get(symbol)
+                if next_states is None:
+                    next_states = row[symbol] = self._step(current, symbol)
+                    built += 1
+                    if (
+                        self.evictions - evictions > self.max_states
+                        and position < built * MIN_PROGRESS
+                    ):
+                        simulate = True
+                current = next_states
+
+            if not current:
+                return False
+
+        return not current.isdisjoint(self._final)
@@ -0,0 +1,217 @@
+from array import array
+from itertools import chain
+from typing import Iterable, Iterator, List, Set, Tuple, Union
+from .compiled import DEAD
+from .dfa import DFA
+from re_to_dfa.operators import OPERATORS, end_marker
+from re_to_dfa.regex import Regex
+from re_to_dfa.syntaxtree import SyntaxTree
+
+# Token = (nome do token, início, fim) de um lexema na entrada
+Token = Tuple[str, int, int]
+
+# Trecho da entrada: texto ou bytes (bytes, mmap, memoryview)
+Chunk = Union[str, bytes, memoryview]
+
+# Quantidade de símbolos lidos por vez de um arquivo ou buffer
+CHUNK_SIZE = 1 << 16
+
+
+class Lexer:
+    """
+    Analisador léxico gerado a partir de uma lista ordenada de pares
+    (token, expressão regular). Todos os padrões formam uma única árvore
+    sintática, cada um com o seu marcador de fim, e um único AFD. Um estado
+    final reconhece o token de menor índice entre os padrões que terminam
+    nele, e a entrada é dividida pelo lexema mais longo (maximal munch), em
+    tempo linear no tamanho da entrada qualquer que seja o número de padrões.
+    Com utf8=True os padrões são construídos sobre os bytes da codificação
+    UTF-8, e a entrada em bytes é lida sem decodificação.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, str]], utf8: bool = False) -> None:
+        self.tokens: List[str] = []
+
+        postfix = []
+        for pattern, (token, regular_expression) in enumerate(patterns):
+            regex = Regex(regular_expression, utf8).get_regex()
+            # A expressão pós-fixa termina sempre com o marcador de fim e a
+            # concatenação: ... # .
+            regex[-2] = end_marker(pattern)
+            postfix.extend(regex)
+            if pattern:
+                postfix.append(OPERATORS["|"])
+            self.tokens.append(token)
+
+        if not self.tokens:
+            raise Exception("Lexer needs at least one pattern.")
+
+        self.dfa = DFA()
+        patterns_of = self.dfa._from_syntax_tree(SyntaxTree(postfix))
+        self.dfa.validate()
+
+        compiled = self.dfa.compile()
+        # Padrão reconhecido por cada estado da tabela compilada (DEAD se não
+        # for final)
+        self.accept = array(
+            "l", (patterns_of.get(state, DEAD) for state in compiled.states)
+        )
+
+    def match(self, text: str, start: int = 0) -> Tuple[int, int]:
+        """
+        Longest match starting at `start`: (pattern, end), or (DEAD, start)
+        when no pattern matches a non-empty prefix
+        """
+        compiled = self.dfa.compile()
+        table = compiled.table
+        symbol_index = compiled.symbol_index
+        accept = self.accept
+        width = len(compiled.symbols)
+
+        state = compiled.initial
+        matched, end = DEAD, start
+        for position in range(start, len(text)):
+            column = symbol_index.get(text[position])
+            if column is None:
+                break
+            state = table[state * width + column]
+            if state == DEAD:
+                break
+            if accept[state] != DEAD:
+                matched, end = accept[state], position + 1
+        return matched, end
+
+    def tokenize(self, text: str) -> Iterator[Token]:
+        return self._scan((text,))
+
+    def tokenize_stream(self, source, chunk_size: int = CHUNK_SIZE) -> Iterator[Token]:
+        """
+        Tokenize a bytes-like buffer (bytes, mmap, memoryview), a file object
+        or an iterable of chunks, `chunk_size` symbols at a time. Bytes are
+        read as the latin-1 symbol of the same code and positions are byte
+        offsets.
+        """
+        if isinstance(source, str):
+            return self._scan((source,))
+        try:
+            view = memoryview(source).cast("B")
+        except TypeError:
+            if hasattr(source, "read"):
+                return self._scan(_read(source, chunk_size))
+            return self._scan(source)
+        return self._scan(
+            view[i : i + chunk_size] for i in range(0, len(view), chunk_size)
+        )
+
+    def _scan(self, chunks: Iterable[Chunk]) -> Iterator[Token]:
+        compiled = self.dfa.compile()
+        table = compiled.table
+        accept = self.accept
+        width = len(compiled.symbols)
+        symbol_index = compiled.symbol_index
+        byte_index = {
+            byte: symbol_index[chr(byte)]
+            for byte in range(256)
+            if chr(byte) in symbol_index
+        }
+
+        # Pares (estado, posição) já percorridos depois do último estado final
+        # de um lexema, guardados como posição * count + estado. A partir
+        # deles nenhum estado final é alcançado, então um lexema seguinte que
+        # chegue a um deles para ali, sem reler a mesma entrada: cada par é
+        # percorrido no máximo uma vez e a análise é linear no tamanho da
+        # entrada.
+        count = len(compiled.states)
+        trail: List[int] = []
+        failed: Set[int] = set()
+        failed_until = -1
+
+        state = compiled.initial
+        matched = DEAD
+        # Posições absolutas: início do lexema em andamento e fim do último
+        # lexema reconhecido a partir dele
+        start = end = 0
+        # data é o bloco atual, a partir da posição base. previous guarda os
+        # símbolos de blocos anteriores que ainda podem ser relidos, a partir
+        # da posição previous_base.
+        data: Chunk = ""
+        previous: Chunk = ""
+        base = previous_base = 0
+
+        for chunk in chain(chunks, (None,)):
+            keep = end if matched != DEAD else start
+            if keep < base:
+                previous = _join(previous[keep - previous_base :], data)
+            else:
+                previous = data[keep - base :]
+            previous_base = keep
+            base = keep + len(previous)
+            data = chunk if chunk is not None else previous[:0]
+            columns = symbol_index if isinstance(data, str) else byte_index
+
+            i = 0
+            while True:
+                if i < len(data):
+                    column = columns.get(data[i], DEAD)
+                    if column != DEAD:
+                        next_state = table[state * width + column]
+                        if next_state != DEAD:
+                            if accept[next_state] != DEAD:
+                                state = next_state
+                                i += 1
+                                matched, end = accept[state], base + i
+                                if trail:
+                                    trail.clear()
+                                continue
+                            pair = (base + i + 1) * count + next_state
+                            if pair not in failed:
+                                state = next_state
+                                i += 1
+                                trail.append(pair)
+                                continue
+                elif chunk is not None or start == base + i:
+                    # O lexema continua no próximo bloco
+                    break
+
+                # O lexema em andamento termina no último estado final lido
+                if matched == DEAD:
+                    symbol = (
+                        data[start - base]
+                        if start >= base
+                        else previous[start - previous_base]
+                    )
+                    if isinstance(symbol, int):
+                        symbol = bytes([symbol])
+                    raise Exception(f"No token matches {symbol!r} at position {start}.")
+
+                yield self.tokens[matched], start, end
+                if failed and end > failed_until:
+                    failed.clear()
+                if trail:
+                    failed.update(trail)
+                    failed_until = max(failed_until, trail[-1] // count)
+                    trail.clear()
+                start = end
+                state = compiled.initial
+                matched = DEAD
+                if end < base:
+                    data = _join(previous[end - previous_base :], data)
+                    base = end
+                i = end - base
+
+
+def _read(file, chunk_size: int) -> Iterator[Chunk]:
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _join(head: Chunk, tail: Chunk) -> Chunk:
+    """Concatenação de dois trechos da entrada (str ou bytes-like)"""
+    if not len(head):
+        return tail
+    if isinstance(head, str):
+        return head + tail
+    return bytes(head) + bytes(tail)
@@ -1,8 +1,11 @@
-from typing import Set
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Set, Tuple
 from .automaton import Automaton
 from .constants import EPSILON
-from .types import State
+from .types import State, Symbol
 from .dfa import DFA
+from .compiled import CompiledDFA
+from .compact import CompactNFA
+from .lazy import LazyDFA, LAZY_CACHE_SIZE
 
 
 class NFA(Automaton):
@@ -10,10 +13,71 @@ class NFA(Automaton):
         super().__init__()
 
     def epsilon_closure(self, state: State) -> Set[State]:
-        closure: Set[State] = {state}
-        for next_state in self.move(state, EPSILON):
-            closure |= self.epsilon_closure(next_state)
-        return closure
+        return set(self.epsilon_closures().get(state, {state}))
+
+    def epsilon_closures(self) -> Dict[State, FrozenSet[State]]:
+        if "closures" not in self._cache:
+            self._cache["closures"] = self._compute_epsilon_closures()
+        return self._cache["closures"]
+
+    def _compute_epsilon_closures(self) -> Dict[State, FrozenSet[State]]:
+        # Componentes fortemente conexas das transições por ε (Tarjan
+        # iterativo). Os estados de uma mesma componente compartilham o fecho,
+        # e as componentes são fechadas depois de todas as que elas alcançam.
+        closures: Dict[State, FrozenSet[State]] = {}
+        index: Dict[State, int] = {}
+        low: Dict[State, int] = {}
+        stack: List[State] = []
+        on_stack: Set[State] = set()
+
+        for root in self.transitions:
+            if root in index:
+                continue
+
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work: List[Tuple[State, Iterator[State]]] = [
+                (root, iter(self.move(root, EPSILON)))
+            ]
+            while work:
+                state, successors = work[-1]
+                for next_state in successors:
+                    if next_state not in index:
+                        index[next_state] = low[next_state] = len(index)
+                        stack.append(next_state)
+                        on_stack.add(next_state)
+                        work.append((next_state, iter(self.move(next_state, EPSILON))))
+                        break
+                    if next_state in on_stack:
+                        low[state] = min(low[state], index[next_state])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[state])
+                    if low[state] != index[state]:
+                        continue
+
+                    component: Set[State] = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == state:
+                            break
+
+                    closure = set(component)
+                    for member in component:
+                        for next_state in self.move(member, EPSILON):
+                            if next_state not in component:
+                                closure |= closures[next_state]
+
+                    frozen_closure = frozenset(closure)
+                    for member in component:
+                        closures[member] = frozen_closure
+
+        return closures
 
     def _states_to_str(self, state: Set[State]) -> str:
         return "{" + ", ".join(sorted(state)) + "}"
@@ -25,34 +89,95 @@ class NFA(Automaton):
         if self.initial_state is None:
             return dfa
 
-        initial_epsilon_closure = self.epsilon_closure(self.initial_state)
-        dfa.initial_state = self._states_to_str(initial_epsilon_closure)
+        self._complete_transitions()
 
-        queue = [initial_epsilon_closure]
-        while queue:
-            current_states = queue.pop()
-            current_states_str = self._states_to_str(current_states)
+        # Estados do AFND numerados em ordem alfabética; cada estado do AFD é
+        # um inteiro cujo bit i indica a presença do i-ésimo estado do AFND
+        states = sorted(self.states | {self.initial_state})
+        state_bit = {state: 1 << i for i, state in enumerate(states)}
+        closures = self.epsilon_closures()
+        closure_masks = {
+            state: sum(state_bit[member] for member in closures.get(state, {state}))
+            for state in states
+        }
+
+        symbols = [symbol for symbol in self.alphabet if symbol != EPSILON]
+        successors: Dict[Symbol, List[int]] = {}
+        for symbol in symbols:
+            successors[symbol] = []
+            for state in states:
+                mask = 0
+                for next_state in self.move(state, symbol):
+                    mask |= closure_masks[next_state]
+                successors[symbol].append(mask)
 
-            for symbol in self.alphabet:
-                if symbol == EPSILON:
-                    continue
-                next_states: Set[State] = set()
+        initial_mask = closure_masks[self.initial_state]
+        subsets: Dict[int, Dict[Symbol, int]] = {}
+        queue = [initial_mask]
+        while queue:
+            current_mask = queue.pop()
+            if current_mask in subsets:
+                continue
+            subsets[current_mask] = {}
 
-                for state in current_states:
-                    for next_state in self.move(state, symbol):
-                        next_states |= self.epsilon_closure(next_state)
+            for symbol in symbols:
+                symbol_successors = successors[symbol]
+                next_mask = 0
+                remaining = current_mask
+                while remaining:
+                    lowest = remaining & -remaining
+                    next_mask |= symbol_successors[lowest.bit_length() - 1]
+                    remaining ^= lowest
 
-                next_states_str = self._states_to_str(next_states)
-                if next_states_str not in dfa.states:
-                    queue.append(next_states)
+                if next_mask not in subsets:
+                    queue.append(next_mask)
+                subsets[current_mask][symbol] = next_mask
 
-                dfa.add_transition(current_states_str, symbol, {next_states_str})
+        names = {
+            mask: self._states_to_str(
+                {state for state in states if mask & state_bit[state]}
+            )
+            for mask in subsets
+        }
+        final_mask = sum(
+            state_bit[state] for state in self.final_states if state in state_bit
+        )
 
-        for state in dfa.states:
-            for final_state in self.final_states:
-                if final_state in state:
-                    dfa.final_states.add(state)
+        dfa.initial_state = names[initial_mask]
+        dfa.final_states = {names[mask] for mask in subsets if mask & final_mask}
+        dfa._transitions = {
+            names[mask]: {
+                symbol: {names[next_mask]} for symbol, next_mask in moves.items()
+            }
+            for mask, moves in subsets.items()
+        }
         return dfa.validate()
 
-    def recognize_sentence(self, sentence: str) -> bool:
-        return self.to_dfa().recognize_sentence(sentence)
+    def compile(self) -> CompiledDFA:
+        # O AFD equivalente é mantido enquanto o AFND não for alterado
+        if "compiled" not in self._cache:
+            self._cache["compiled"] = self.to_dfa().compile()
+        return self._cache["compiled"]
+
+    def compile_lazy(self, max_states: int = LAZY_CACHE_SIZE) -> LazyDFA:
+        lazy = self._cache.get("lazy")
+        if lazy is None or lazy.max_states != max_states:
+            self._complete_transitions()
+            lazy = self._cache["lazy"] = LazyDFA(self, max_states)
+        return lazy
+
+    def to_compact(self) -> CompactNFA:
+        return CompactNFA.from_nfa(self)
+
+    def recognize_sentence(self, sentence: str, lazy: bool = False) -> bool:
+        if lazy:
+            return self.compile_lazy().match(sentence)
+        return self.compile().match(sentence)
+
+    def recognize_many(
+        self, sentences: Iterable[str], lazy: bool = False
+    ) -> List[bool]:
+        if lazy:
+            matcher = self.compile_lazy()
+            return [matcher.match(sentence) for sentence in sentences]
+        return self.compile().match_many(sentences)
@@ -0,0 +1,10 @@
+from .binary import FORMAT_VERSION, pack, unpack
+from .disk import DiskCache
+from .tables import (
+    dump_dfa,
+    load_dfa,
+    dump_parser,
+    load_parser,
+    cached_dfa,
+    cached_parser,
+)
@@ -0,0 +1,108 @@
+import struct
+import sys
+from array import array
+from typing import List, Sequence, Tuple, Union
+
+# Versão do formato: muda sempre que o layout ou o conteúdo das tabelas
+# serializadas mudar, invalidando o que já está em cache. A chave do cache
+# depende apenas desta versão e do texto de origem, então ela também deve
+# ser incrementada quando a construção dos AFDs ou das tabelas LL(1) passar
+# a produzir outro resultado (por exemplo outra numeração de estados), ou
+# as tabelas antigas, ainda válidas, continuarão sendo lidas.
+FORMAT_VERSION = 2
+
+MAGIC = b"LFCT"
+
+# magic, versão, ordem dos bytes, tipo do conteúdo, nº de strings, nº de arrays
+HEADER = struct.Struct("<4sHH4sII")
+# deslocamento, quantidade de itens e typecode de cada array
+ARRAY = struct.Struct("<QQ1s7x")
+LENGTH = struct.Struct("<I")
+
+BYTE_ORDER = {"little": 1, "big": 2}[sys.byteorder]
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def pack(kind: bytes, strings: Sequence[str], arrays: Sequence[array]) -> bytes:
+    """
+    Serializa strings e arrays de inteiros. Os arrays ficam alinhados em 8
+    bytes no final do arquivo, na ordem de bytes da máquina, para serem lidos
+    de um mmap sem cópia.
+    """
+    encoded = [string.encode("utf-8") for string in strings]
+    start = HEADER.size + ARRAY.size * len(arrays)
+    start += sum(LENGTH.size + len(string) for string in encoded)
+
+    offset = start + -start % 8
+    descriptors = []
+    for values in arrays:
+        descriptors.append(
+            ARRAY.pack(offset, len(values), values.typecode.encode("ascii"))
+        )
+        size = values.itemsize * len(values)
+        offset += size + -size % 8
+
+    data = bytearray(
+        HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER, kind, len(strings), len(arrays))
+    )
+    for descriptor in descriptors:
+        data += descriptor
+    for string in encoded:
+        data += LENGTH.pack(len(string))
+        data += string
+    for values in arrays:
+        data += bytes(-len(data) % 8)
+        data += values.tobytes()
+    return bytes(data)
+
+
+def unpack(buffer: Buffer, kind: bytes) -> Tuple[List[str], List[memoryview]]:
+    """
+    Lê o que foi serializado por pack. Os arrays são devolvidos como
+    memoryviews sobre o próprio buffer. Lança ValueError se o buffer não
+    for do tipo esperado ou de outra versão do formato.
+    """
+    view = memoryview(buffer)
+    if len(view) < HEADER.size:
+        raise ValueError("Truncated table.")
+    magic, version, byte_order, found, strings_count, arrays_count = HEADER.unpack_from(
+        view
+    )
+    if (magic, version, byte_order, found) != (
+        MAGIC,
+        FORMAT_VERSION,
+        BYTE_ORDER,
+        kind,
+    ):
+        raise ValueError(f"Not a version {FORMAT_VERSION} {kind!r} table.")
+
+    position = HEADER.size
+    if position + ARRAY.size * arrays_count > len(view):
+        raise ValueError("Truncated table.")
+    descriptors = []
+    for _ in range(arrays_count):
+        descriptors.append(ARRAY.unpack_from(view, position))
+        position += ARRAY.size
+
+    strings: List[str] = []
+    for _ in range(strings_count):
+        if position + LENGTH.size > len(view):
+            raise ValueError("Truncated table.")
+        (length,) = LENGTH.unpack_from(view, position)
+        position += LENGTH.size
+        if position + length > len(view):
+            raise ValueError("Truncated table.")
+        # UnicodeDecodeError também é um ValueError
+        strings.append(bytes(view[position : position + length]).decode("utf-8"))
+        position += length
+
+    arrays: List[memoryview] = []
+    for offset, count, typecode in descriptors:
+        # Um typecode inválido também lança ValueError
+        typecode = typecode.decode("ascii")
+        size = count * array(typecode).itemsize
+        if offset + size > len(view):
+            raise ValueError("Truncated table.")
+        arrays.append(view[offset : offset + size].cast(typecode))
+    return strings, arrays
@@ -0,0 +1,51 @@
+import hashlib
+import mmap
+import os
+import tempfile
+from typing import Union
+from .binary import FORMAT_VERSION
+
+# Diretório padrão do cache, que pode ser trocado pela variável de ambiente
+CACHE_DIR = os.environ.get(
+    "LFC_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "lfc")
+)
+
+
+class DiskCache:
+    """
+    Diretório de tabelas serializadas. Cada arquivo é identificado pelo hash
+    do tipo da tabela, da versão do formato e do texto de origem (expressão
+    regular ou gramática), e é carregado com mmap. O código que constrói as
+    tabelas não faz parte da chave: veja FORMAT_VERSION.
+    """
+
+    def __init__(self, directory: Union[str, None] = None) -> None:
+        self.directory = directory if directory is not None else CACHE_DIR
+
+    def key(self, kind: str, source: str) -> str:
+        text = f"{FORMAT_VERSION}\0{kind}\0{source}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".bin")
+
+    def load(self, key: str) -> Union[mmap.mmap, None]:
+        try:
+            with open(self.path(key), "rb") as file:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Arquivo inexistente, ilegível ou vazio
+            return None
+
+    def store(self, key: str, data: bytes) -> None:
+        # Escreve em um arquivo temporário e o renomeia, para que outro
+        # processo nunca leia uma tabela pela metade
+        os.makedirs(self.directory, exist_ok=True)
+        file = tempfile.NamedTemporaryFile(dir=self.directory, delete=False)
+        try:
+            with file:
+                file.write(data)
+            os.replace(file.name, self.path(key))
+        except BaseException:
+            os.unlink(file.name)
+            raise
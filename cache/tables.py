@@ -0,0 +1,183 @@
+import json
+from array import array
+from typing import Dict, List, Union
+from automata import DFA, CompiledDFA
+from grammars import ContextFreeGrammar, Production
+from predictive_parser.LL1 import PredictiveParserLL1
+from predictive_parser.compiled import ERROR, CompiledLL1
+from re_to_dfa.regex import Regex
+from re_to_dfa.syntaxtree import SyntaxTree
+from .binary import Buffer, pack, unpack
+from .disk import DiskCache
+
+DFA_KIND = b"CDFA"
+PARSER_KIND = b"LL1T"
+
+
+def dump_dfa(compiled: CompiledDFA) -> bytes:
+    # Símbolos de classes, que usam a coluna do rótulo da classe
+    aliases = [
+        symbol
+        for symbol, column in compiled.symbol_index.items()
+        if compiled.symbols[column] != symbol
+    ]
+    return pack(
+        DFA_KIND,
+        compiled.states + compiled.symbols + aliases,
+        [
+            array("q", [len(compiled.states), len(compiled.symbols), compiled.initial]),
+            array("q", [compiled.symbol_index[symbol] for symbol in aliases]),
+            array("q", compiled.table),
+            array("B", compiled.accept),
+        ],
+    )
+
+
+def load_dfa(buffer: Buffer) -> CompiledDFA:
+    strings, (sizes, alias_columns, table, accept) = unpack(buffer, DFA_KIND)
+    states_count, symbols_count, initial = sizes
+    states = strings[:states_count]
+    symbols = strings[states_count : states_count + symbols_count]
+    symbol_index = {symbol: column for column, symbol in enumerate(symbols)}
+    symbol_index.update(zip(strings[states_count + symbols_count :], alias_columns))
+    return CompiledDFA.from_tables(
+        states, symbols, symbol_index, table, accept, initial
+    )
+
+
+def dump_parser(parser: PredictiveParserLL1) -> bytes:
+    compiled = parser.compile()
+    # Terminais e não terminais primeiro, com os mesmos números da forma
+    # compilada
+    names: List[str] = compiled.terminals + compiled.non_terminals
+    index: Dict[str, int] = {symbol: i for i, symbol in enumerate(names)}
+
+    def intern(symbol: str) -> int:
+        if symbol not in index:
+            index[symbol] = len(names)
+            names.append(symbol)
+        return index[symbol]
+
+    sizes = array(
+        "q", [len(compiled.terminals), len(compiled.non_terminals), compiled.initial]
+    )
+
+    # Produções como [cabeça, tamanho, símbolos...], na ordem da forma
+    # compilada
+    productions = array("q")
+    for non_terminal, bodies in parser.grammar.productions.items():
+        for body in bodies:
+            productions.append(intern(non_terminal))
+            productions.append(len(body))
+            productions.extend(intern(symbol) for symbol in body)
+
+    # FIRST e FOLLOW como [não terminal, tamanho, terminais...]
+    sets = []
+    for symbol_sets in (parser.firsts, parser.follows):
+        values = array("q")
+        for non_terminal, terminals in symbol_sets.items():
+            values.append(intern(non_terminal))
+            values.append(len(terminals))
+            values.extend(intern(terminal) for terminal in sorted(terminals))
+        sets.append(values)
+
+    return pack(
+        PARSER_KIND,
+        names,
+        [sizes, productions, array("q", compiled.table), *sets],
+    )
+
+
+def load_parser(buffer: Buffer) -> PredictiveParserLL1:
+    names, (sizes, productions, table, firsts, follows) = unpack(buffer, PARSER_KIND)
+    terminals_count, non_terminals_count, initial = sizes
+    terminals = names[:terminals_count]
+    non_terminals = names[terminals_count : terminals_count + non_terminals_count]
+
+    grammar = ContextFreeGrammar()
+    grammar.initial_symbol = names[initial]
+    bodies: List[Production] = []
+    position = 0
+    while position < len(productions):
+        non_terminal, length = productions[position], productions[position + 1]
+        body = [
+            names[symbol]
+            for symbol in productions[position + 2 : position + 2 + length]
+        ]
+        grammar.add_production(names[non_terminal], body)
+        bodies.append(grammar.productions[names[non_terminal]][-1])
+        position += 2 + length
+
+    parser = PredictiveParserLL1()
+    parser.grammar = grammar
+    width = len(terminals)
+    for row, non_terminal in enumerate(non_terminals):
+        parser.table[non_terminal] = {
+            terminal: bodies[table[row * width + column]]
+            for column, terminal in enumerate(terminals)
+            if table[row * width + column] != ERROR
+        }
+    for values, symbol_sets in ((firsts, parser.firsts), (follows, parser.follows)):
+        position = 0
+        while position < len(values):
+            non_terminal, length = values[position], values[position + 1]
+            symbol_sets[names[non_terminal]] = {
+                names[terminal]
+                for terminal in values[position + 2 : position + 2 + length]
+            }
+            position += 2 + length
+
+    # A tabela densa é usada pelo analisador sem ser copiada
+    parser._compiled = CompiledLL1.from_tables(
+        terminals, non_terminals, bodies, table, initial
+    )
+    return parser
+
+
+def cached_dfa(
+    regular_expression: str, utf8: bool = False, cache: Union[DiskCache, None] = None
+) -> CompiledDFA:
+    """
+    AFD mínimo compilado da expressão regular, lido do cache quando já
+    construído por uma execução anterior
+    """
+    cache = cache if cache is not None else DiskCache()
+    key = cache.key(DFA_KIND.decode(), json.dumps([regular_expression, utf8]))
+
+    buffer = cache.load(key)
+    if buffer is not None:
+        try:
+            return load_dfa(buffer)
+        except (ValueError, IndexError, KeyError):
+            # Arquivo corrompido ou de outra versão: é reconstruído
+            pass
+        # O mapeamento é fechado antes de o arquivo ser substituído, o que
+        # falharia no Windows com o arquivo ainda mapeado. Quando a leitura dá
+        # certo ele continua aberto, pois as tabelas são lidas dele sem cópia.
+        buffer.close()
+
+    tree = SyntaxTree(Regex(regular_expression, utf8).get_regex())
+    compiled = DFA().from_syntax_tree(tree).minimize().compile()
+    cache.store(key, dump_dfa(compiled))
+    return compiled
+
+
+def cached_parser(
+    grammar: ContextFreeGrammar, cache: Union[DiskCache, None] = None
+) -> PredictiveParserLL1:
+    """Analisador LL(1) da gramática, lido do cache quando já construído"""
+    cache = cache if cache is not None else DiskCache()
+    source = json.dumps([grammar.initial_symbol, list(grammar.productions.items())])
+    key = cache.key(PARSER_KIND.decode(), source)
+
+    buffer = cache.load(key)
+    if buffer is not None:
+        try:
+            return load_parser(buffer)
+        except (ValueError, IndexError, KeyError):
+            pass
+        buffer.close()
+
+    parser = PredictiveParserLL1().from_grammar(grammar)
+    cache.store(key, dump_parser(parser))
+    return parser
@@ -1,6 +1,6 @@
 from .grammar import Grammar
 from .constants import EPSILON, END
-from typing import Dict, List, Set, Union
+from typing import AbstractSet, Dict, FrozenSet, List, Set, Union
 from .types import Production, NonTerminal, Terminal
 
 
@@ -11,18 +11,13 @@ class ContextFreeGrammar(Grammar):
     # (g.2.1) verificação de não determinismo
     def has_direct_non_deterministic(self):
         for productions in self.productions.values():
-            symbols_to_productions: Dict[Terminal, List[Production]] = {}
-            for symbol in self.terminals:
-                symbols_to_productions[symbol] = []
-
+            symbols: Set[Terminal] = set()
             for production in productions:
                 symbol = production[0]
                 if symbol in self.terminals:
-                    symbols_to_productions[symbol].append(production)
-
-            for symbol, productions in symbols_to_productions.items():
-                if len(productions) > 1:
-                    return True
+                    if symbol in symbols:
+                        return True
+                    symbols.add(symbol)
 
         return False
 
@@ -95,7 +90,7 @@ class ContextFreeGrammar(Grammar):
             if new_grammar.has_direct_non_deterministic():
                 new_grammar = new_grammar._remove_direct_non_determinism()
             else:
-                new_grammar._productions[non_terminal] = productions
+                new_grammar._replace_productions(non_terminal, productions)
 
         return new_grammar.validate()
 
@@ -241,73 +236,243 @@ class ContextFreeGrammar(Grammar):
     # (g.4)  Firsts
     def firsts(self):
         firsts: Dict[Union[NonTerminal, Terminal], Set[Terminal]] = {}
-        for non_terminal in self.non_terminals:
-            firsts[non_terminal] = self._firsts(non_terminal)
+        for non_terminal, symbols in self._first_table().items():
+            firsts[non_terminal] = set(symbols)
 
         return firsts
 
-    def _firsts(self, symbol: Union[NonTerminal, Terminal]) -> Set[Terminal]:
+    def first_of_sequence(self, symbols: Production) -> Set[Terminal]:
+        """FIRST de uma sequência de símbolos, com ε se toda ela for anulável"""
+        table = self._first_table()
         firsts: Set[Terminal] = set()
+        for symbol in symbols:
+            if symbol == EPSILON:
+                continue
+            symbol_firsts = table.get(symbol, (symbol,))
+            firsts.update(symbol_firsts)
+            if EPSILON not in symbol_firsts:
+                # O ε dos prefixos anuláveis não chega ao fim da sequência
+                firsts.discard(EPSILON)
+                return firsts
+        firsts.add(EPSILON)
+        return firsts
 
-        if symbol in self.terminals:
-            firsts.add(symbol)
-            return firsts
-
-        for production in self.productions[symbol]:
-            if production[0] in self.terminals:
-                firsts.add(production[0])
-            elif production[0] == EPSILON:
-                firsts.add(EPSILON)
-            elif production[0] in self.non_terminals:
-                next_firsts = self._firsts(production[0])
-                firsts.update(next_firsts - {EPSILON})
-                if EPSILON in next_firsts:
-                    i = 1
-                    while i < len(production) and EPSILON in next_firsts:
-                        next_firsts = self._firsts(production[i])
-                        firsts.update(next_firsts - {EPSILON})
-                        i += 1
-                    if i == len(production) and EPSILON in next_firsts:
-                        firsts.add(EPSILON)
+    def _firsts(self, symbol: Union[NonTerminal, Terminal]) -> AbstractSet[Terminal]:
+        return self._first_table().get(symbol, frozenset((symbol,)))
+
+    def _first_table(self) -> Dict[NonTerminal, FrozenSet[Terminal]]:
+        """
+        FIRST de todos os não terminais, calculado uma única vez por ponto
+        fixo e guardado até a próxima alteração das produções
+        """
+        if "firsts" not in self._cache:
+            self._cache["firsts"] = self._compute_firsts()
+        return self._cache["firsts"]
+
+    def _compute_firsts(self) -> Dict[NonTerminal, FrozenSet[Terminal]]:
+        productions = self.productions
+        nullable = self._nullable()
+
+        # FIRST(A) recebe os terminais que iniciam alguma produção de A, e
+        # FIRST(A) ⊇ FIRST(B) - {ε} quando B aparece em uma produção de A
+        # depois apenas de símbolos anuláveis (A depende de B)
+        terminals: Dict[NonTerminal, Set[Terminal]] = {}
+        depends: Dict[NonTerminal, Set[NonTerminal]] = {}
+        for non_terminal, non_terminal_productions in productions.items():
+            terminals[non_terminal] = set()
+            depends[non_terminal] = set()
+            for production in non_terminal_productions:
+                for symbol in production:
+                    if symbol == EPSILON:
+                        continue
+                    if symbol not in productions:
+                        terminals[non_terminal].add(symbol)
+                        break
+                    depends[non_terminal].add(symbol)
+                    if symbol not in nullable:
+                        break
+
+        # Todos os não terminais de uma componente fortemente conexa têm o
+        # mesmo FIRST, calculado uma única vez depois das componentes de que
+        # ela depende
+        # Os conjuntos guardados são imutáveis, para que nenhum chamador altere
+        # o FIRST de outros não terminais da mesma componente
+        firsts: Dict[NonTerminal, FrozenSet[Terminal]] = {}
+        for component in _components(depends):
+            component_firsts: Set[Terminal] = set()
+            for non_terminal in component:
+                component_firsts |= terminals[non_terminal]
+                for symbol in depends[non_terminal]:
+                    if symbol in firsts:
+                        component_firsts |= firsts[symbol]
+            component_firsts.discard(EPSILON)
+            frozen = frozenset(component_firsts)
+            for non_terminal in component:
+                firsts[non_terminal] = frozen
+
+        for non_terminal in productions:
+            if non_terminal in nullable:
+                firsts[non_terminal] = firsts[non_terminal] | {EPSILON}
         return firsts
 
+    def _nullable(self) -> FrozenSet[NonTerminal]:
+        """Não terminais que derivam ε, em um conjunto imutável"""
+        if "nullable" not in self._cache:
+            self._cache["nullable"] = self._compute_nullable()
+        return self._cache["nullable"]
+
+    def _compute_nullable(self) -> FrozenSet[NonTerminal]:
+        productions = self.productions
+
+        # Para cada produção, quantos dos seus símbolos ainda não são
+        # sabidamente anuláveis. A produção torna a cabeça anulável quando a
+        # contagem chega a zero.
+        pending: List[List] = []
+        uses: Dict[NonTerminal, List[int]] = {}
+        nullable: Set[NonTerminal] = set()
+        worklist: List[NonTerminal] = []
+        for non_terminal, non_terminal_productions in productions.items():
+            for production in non_terminal_productions:
+                symbols = [symbol for symbol in production if symbol != EPSILON]
+                if any(symbol not in productions for symbol in symbols):
+                    continue
+                if not symbols:
+                    if non_terminal not in nullable:
+                        nullable.add(non_terminal)
+                        worklist.append(non_terminal)
+                    continue
+                for symbol in symbols:
+                    uses.setdefault(symbol, []).append(len(pending))
+                pending.append([non_terminal, len(symbols)])
+
+        while worklist:
+            symbol = worklist.pop()
+            for index in uses.get(symbol, []):
+                entry = pending[index]
+                entry[1] -= 1
+                if entry[1] == 0 and entry[0] not in nullable:
+                    nullable.add(entry[0])
+                    worklist.append(entry[0])
+        return frozenset(nullable)
+
     # (g.4.2)  Follows
     def follows(self):
-        import json
+        follows: Dict[NonTerminal, Set[Terminal]] = {}
+        for non_terminal, symbols in self._follow_table().items():
+            follows[non_terminal] = set(symbols)
 
-        table = self._follows({})
-        table_hash = hash(json.dumps(str(table), sort_keys=True))
-        test_hash = ""
-        while table_hash != test_hash:
-            test_hash = table_hash
-            table = self._follows(table)
-            table_hash = hash(json.dumps(str(table), sort_keys=True))
+        return follows
 
-        return table
+    def _follow_table(self) -> Dict[NonTerminal, FrozenSet[Terminal]]:
+        # FOLLOW depende também do símbolo inicial, que pode ser trocado sem
+        # alterar as produções
+        cached = self._cache.get("follows")
+        if cached is None or cached[0] != self.initial_symbol:
+            cached = self._cache["follows"] = (
+                self.initial_symbol,
+                self._compute_follows(),
+            )
+        return cached[1]
+
+    def _compute_follows(self) -> Dict[NonTerminal, FrozenSet[Terminal]]:
+        productions = self.productions
+        firsts = self._first_table()
+
+        # Em A → αXβ, FOLLOW(X) recebe FIRST(β) - {ε}, e FOLLOW(X) ⊇ FOLLOW(A)
+        # quando β é anulável (X depende de A). Cada produção é percorrida
+        # uma única vez, da direita para a esquerda.
+        terminals: Dict[NonTerminal, Set[Terminal]] = {
+            non_terminal: set() for non_terminal in productions
+        }
+        depends: Dict[NonTerminal, Set[NonTerminal]] = {
+            non_terminal: set() for non_terminal in productions
+        }
+        if self.initial_symbol in terminals:
+            terminals[self.initial_symbol].add(END)
+
+        for non_terminal, non_terminal_productions in productions.items():
+            for production in non_terminal_productions:
+                # FIRST(β) - {ε} e se β é anulável, para o β atual
+                trailer: AbstractSet[Terminal] = set()
+                nullable = True
+                for symbol in reversed(production):
+                    if symbol == EPSILON:
+                        continue
+                    if symbol not in productions:
+                        trailer = {symbol}
+                        nullable = False
+                        continue
 
-    def _follows(self, follow_table: Dict[NonTerminal, Set[Terminal]]):
-        follows: Dict[NonTerminal, Set[Terminal]] = follow_table
+                    terminals[symbol] |= trailer
+                    if nullable and symbol != non_terminal:
+                        depends[symbol].add(non_terminal)
 
-        for non_terminal in self.non_terminals:
-            if non_terminal not in follows:
-                follows[non_terminal] = set()
+                    symbol_firsts = firsts[symbol]
+                    if EPSILON in symbol_firsts:
+                        trailer = (trailer | symbol_firsts) - {EPSILON}
+                    else:
+                        trailer = symbol_firsts
+                        nullable = False
+
+        # Os conjuntos são propagados pelas componentes fortemente conexas
+        # das dependências, como em FIRST: cada componente é calculada uma
+        # única vez, depois das componentes de que depende
+        follows: Dict[NonTerminal, FrozenSet[Terminal]] = {}
+        for component in _components(depends):
+            component_follows: Set[Terminal] = set()
+            for non_terminal in component:
+                component_follows |= terminals[non_terminal]
+                for symbol in depends[non_terminal]:
+                    if symbol in follows:
+                        component_follows |= follows[symbol]
+            frozen = frozenset(component_follows)
+            for non_terminal in component:
+                follows[non_terminal] = frozen
 
-        follows[self.initial_symbol].add(END)
+        return follows
 
-        for non_terminal, productions in self.productions.items():
-            for production in productions:
-                for i in range(len(production)):
-                    symbol = production[i]
-                    next_symbol = production[i + 1] if i + 1 < len(production) else None
-                    if symbol not in self.non_terminals:
-                        continue
-                    if next_symbol is None:
-                        follows[symbol].update(follows[non_terminal])
-                    if next_symbol:
-                        next_firsts = self._firsts(next_symbol)
-                        follows[symbol].update(next_firsts - {EPSILON})
-                        if EPSILON in next_firsts:
-                            test = next_firsts - {EPSILON} | follows[non_terminal]
-                            follows[symbol].update(test)
 
-        return follows
+def _components(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """
+    Componentes fortemente conexas do grafo (Tarjan, sem recursão), cada
+    componente depois de todas as componentes alcançáveis a partir dela
+    """
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+    components: List[List[str]] = []
+
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        path = [(root, iter(graph[root]))]
+        while path:
+            vertex, successors = path[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = low[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    path.append((successor, iter(graph[successor])))
+                    break
+                if successor in on_stack:
+                    low[vertex] = min(low[vertex], index[successor])
+            else:
+                path.pop()
+                if path:
+                    parent = path[-1][0]
+                    low[parent] = min(low[parent], low[vertex])
+                if low[vertex] == index[vertex]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == vertex:
+                            break
+                    components.append(component)
+    return components
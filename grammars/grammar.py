@@ -1,7 +1,7 @@
-from typing import Set, List, Union
+from typing import AbstractSet, Any, Dict, Set, List, Tuple, Union
 from tabulate import tabulate
 from abc import ABC
-from .types import Terminal, NonTerminal, Productions
+from .types import Terminal, NonTerminal, Production, Productions
 from .constants import START
 
 
@@ -9,6 +9,18 @@ class Grammar(ABC):
     def __init__(self) -> None:
         self.initial_symbol: NonTerminal = START
 
+        # Análises derivadas das produções (anuláveis, FIRST, FOLLOW),
+        # descartadas sempre que as produções são alteradas
+        self._cache: Dict[str, Any] = {}
+
+        # Ocorrências de cada símbolo nos corpos das produções, terminais
+        # (chaves do dicionário) e índice das produções (cabeça, corpo),
+        # mantidos a cada alteração para que sejam consultados em O(1). Os
+        # não terminais são as chaves de _productions.
+        self._uses: Dict[str, int] = {}
+        self._terminals: Dict[Terminal, None] = {}
+        self._index: Set[Tuple[NonTerminal, Tuple[str, ...]]] = set()
+
         self._productions: Productions = {}
 
     def __str__(self):
@@ -38,40 +50,47 @@ class Grammar(ABC):
         return tabulate(table, headers="firstrow", tablefmt="fancy_grid")
 
     def __repr__(self) -> str:
-        return f"Grammar(\n non_terminals={self.non_terminals},\n terminals={self.terminals},\n initial_symbol={self.initial_symbol},\n productions={self.productions}\n)"
+        return f"Grammar(\n non_terminals={set(self.non_terminals)},\n terminals={set(self.terminals)},\n initial_symbol={self.initial_symbol},\n productions={self.productions}\n)"
 
     @property
-    def non_terminals(self) -> Set[NonTerminal]:
-        return set(self._productions.keys())
+    def non_terminals(self) -> AbstractSet[NonTerminal]:
+        return self._productions.keys()
 
     @property
-    def terminals(self) -> Set[Terminal]:
-        terminals: Set[Terminal] = set()
-
-        for productions in self._productions.values():
-            for production in productions:
-                for symbol in production:
-                    if symbol not in self.non_terminals:
-                        terminals.add(symbol)
-
-        return terminals
+    def terminals(self) -> AbstractSet[Terminal]:
+        return self._terminals.keys()
 
     @property
     def productions(self) -> Productions:
         return self._productions
 
+    @property
+    def _productions(self) -> Productions:
+        return self._production_table
+
+    @_productions.setter
+    def _productions(self, productions: Productions) -> None:
+        self._production_table = productions
+        self._reindex()
+
     def add_production(
         self, non_terminal: NonTerminal, production: List[Union[Terminal, NonTerminal]]
     ) -> None:
-        if production in self.productions.get(non_terminal, []):
+        key = (non_terminal, tuple(production))
+        if key in self._index:
             return
+        self._invalidate()
+        self._index.add(key)
+
         if non_terminal not in self.non_terminals:
             self.productions[non_terminal] = [[]]
+            self._terminals.pop(non_terminal, None)
         else:
             self.productions[non_terminal].append([])
 
         for symbol in production:
             self.productions[non_terminal][-1].append(symbol)
+            self._count_use(symbol, 1)
 
     def replace_non_terminals(self):
         chars = [chr(i) for i in range(ord("A"), ord("Z") + 1) if chr(i) != "S"]
@@ -100,6 +119,53 @@ class Grammar(ABC):
 
         return self.validate()
 
+    def _invalidate(self) -> None:
+        if self._cache:
+            self._cache.clear()
+
+    def _count_use(self, symbol: str, delta: int) -> None:
+        uses = self._uses.get(symbol, 0) + delta
+        if uses:
+            self._uses[symbol] = uses
+            if symbol not in self._production_table:
+                self._terminals[symbol] = None
+        else:
+            del self._uses[symbol]
+            self._terminals.pop(symbol, None)
+
+    def _replace_productions(
+        self, non_terminal: NonTerminal, productions: List[Production]
+    ) -> None:
+        """Troca todas as produções de um não terminal"""
+        self._invalidate()
+        if non_terminal not in self._production_table:
+            self._terminals.pop(non_terminal, None)
+        for production in self._production_table.get(non_terminal, []):
+            self._index.discard((non_terminal, tuple(production)))
+            for symbol in production:
+                self._count_use(symbol, -1)
+
+        self._production_table[non_terminal] = productions
+        for production in productions:
+            self._index.add((non_terminal, tuple(production)))
+            for symbol in production:
+                self._count_use(symbol, 1)
+
+    def _reindex(self) -> None:
+        """
+        Recalcula os conjuntos de símbolos e o índice depois que _productions
+        é substituído
+        """
+        self._invalidate()
+        self._uses = {}
+        self._terminals = {}
+        self._index = set()
+        for non_terminal, productions in self._production_table.items():
+            for production in productions:
+                self._index.add((non_terminal, tuple(production)))
+                for symbol in production:
+                    self._count_use(symbol, 1)
+
     def validate(self):
         if self.initial_symbol not in self.non_terminals:
             raise Exception("Initial symbol is not in non terminals")
@@ -1,6 +1,7 @@
 from grammars import ContextFreeGrammar
-from typing import Dict, Set, List
+from typing import Any, Dict, Iterable, Iterator, Set, List, Sequence, Union
 from grammars import NonTerminal, Terminal, Production
+from predictive_parser.compiled import CompiledLL1, Event, TokenKey
 from tabulate import tabulate
 
 EPSILON = "&"
@@ -13,6 +14,7 @@ class PredictiveParserLL1:
         self.firsts: Dict[NonTerminal, Set[Terminal]] = {}
         self.follows: Dict[NonTerminal, Set[Terminal]] = {}
         self.table: Dict[NonTerminal, Dict[Terminal, Production]] = {}
+        self._compiled: Union[CompiledLL1, None] = None
 
     def __str__(self):
         columns = self.grammar.terminals | {END}
@@ -42,54 +44,59 @@ class PredictiveParserLL1:
         self.follows = self.grammar.follows()
 
         for non_terminal in self.grammar.non_terminals:
-            if (
-                EPSILON in self.firsts[non_terminal]
-                and non_terminal in self.follows[non_terminal]
+            if EPSILON in self.firsts[non_terminal] and (
+                self.firsts[non_terminal] & self.follows[non_terminal]
             ):
                 raise Exception(f"First({non_terminal}) ∩ Follow({non_terminal}) != ∅")
 
         self.table = self._build_table()
+        self._compiled = None
         return self
 
+    def compile(self) -> CompiledLL1:
+        """Tabela de análise com símbolos e produções numerados"""
+        if self._compiled is None:
+            self._compiled = CompiledLL1(
+                self.grammar.productions, self.table, self.grammar.initial_symbol
+            )
+        return self._compiled
+
     def _build_table(self) -> Dict[NonTerminal, Dict[Terminal, Production]]:
         table: Dict[NonTerminal, Dict[Terminal, Production]] = {}
         for non_terminal, productions in self.grammar.productions.items():
             table[non_terminal] = {}
             for production in productions:
-                for symbol in self.firsts[non_terminal]:
-                    if symbol != EPSILON and production[0] != EPSILON:
+                firsts = self.grammar.first_of_sequence(production)
+                for symbol in firsts:
+                    if symbol != EPSILON:
                         table[non_terminal][symbol] = production
-                if production[0] == EPSILON:
+                if EPSILON in firsts:
                     for symbol in self.follows[non_terminal]:
                         table[non_terminal][symbol] = production
 
         return table
 
-    def parse(self, sentence: List[str]) -> List[Production]:
-        stack: List[str] = [self.grammar.initial_symbol]
+    def parse(self, sentence: Sequence[Terminal]) -> List[Production]:
+        compiled = self.compile()
         productions: List[Production] = [[self.grammar.initial_symbol]]
-        sentence.append(END)
-
-        while stack:
-            symbol = stack.pop()
-
-            if symbol in self.grammar.terminals:
-                if symbol == sentence[0]:
-                    sentence = sentence[1:]
-                else:
-                    raise Exception("Could not parse sentence")
-            elif symbol in self.grammar.non_terminals:
-                production = self.table.get(symbol, {}).get(sentence[0], [])
-
-                if not production:
-                    raise Exception("Could not parse sentence")
-
-                productions.append(production)
-
-                if production[0] != EPSILON:
-                    stack.extend(reversed(production))
-
-            else:
-                raise Exception("Could not parse sentence")
-
+        productions.extend(
+            compiled.productions[production] for production in compiled.parse(sentence)
+        )
         return productions
+
+    def parse_stream(
+        self, tokens: Iterable[Any], key: TokenKey = None
+    ) -> Iterator[Production]:
+        """
+        Produções de parse, na mesma ordem, produzidas à medida que os tokens
+        são lidos do iterador. `key` extrai o terminal de cada token.
+        """
+        compiled = self.compile()
+        yield [self.grammar.initial_symbol]
+        for production in compiled.parse_stream(tokens, key):
+            yield compiled.productions[production]
+
+    def parse_events(
+        self, tokens: Iterable[Any], key: TokenKey = None
+    ) -> Iterator[Event]:
+        return self.compile().parse_events(tokens, key)
@@ -0,0 +1,269 @@
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+from grammars import NonTerminal, Terminal, Production
+from grammars.constants import EPSILON, END
+
+# Marca de entrada vazia (erro) na tabela compilada
+ERROR = -1
+
+# Eventos da análise em fluxo: (ENTER, não terminal, produção) ao aplicar uma
+# produção, (TOKEN, token) ao consumir um token da entrada e
+# (EXIT, não terminal) quando todo o corpo da produção foi reconhecido
+Event = Tuple[Any, ...]
+ENTER = "enter"
+TOKEN = "token"
+EXIT = "exit"
+
+# Função que extrai o terminal de um token (por exemplo o nome do token de
+# uma tupla (nome, início, fim) do analisador léxico)
+TokenKey = Union[Callable[[Any], Terminal], None]
+
+# Fim dos tokens de um iterador
+_DONE = object()
+
+
+class CompiledLL1:
+    """
+    Forma congelada de um analisador LL(1): terminais (com o fim da entrada
+    $) e não terminais numerados, e a tabela de análise em um array denso
+    (não terminal × terminal) de números de produção. Na pilha de análise um
+    símbolo s é o terminal s quando s < len(terminals), e o não terminal
+    s - len(terminals) caso contrário. O fim da entrada não é um token
+    válido: input_index numera apenas os terminais que podem ser lidos.
+    """
+
+    __slots__ = (
+        "terminals",
+        "terminal_index",
+        "input_index",
+        "non_terminals",
+        "productions",
+        "bodies",
+        "table",
+        "initial",
+        "end",
+    )
+
+    def __init__(
+        self,
+        productions: Dict[NonTerminal, List[Production]],
+        table: Dict[NonTerminal, Dict[Terminal, Production]],
+        initial_symbol: NonTerminal,
+    ) -> None:
+        self.non_terminals: List[NonTerminal] = list(productions.keys())
+        self.terminals: List[Terminal] = sorted(
+            {
+                symbol
+                for bodies in productions.values()
+                for body in bodies
+                for symbol in body
+                if symbol not in productions and symbol != EPSILON
+            }
+            | {END}
+        )
+        self.terminal_index: Dict[Terminal, int] = {
+            terminal: i for i, terminal in enumerate(self.terminals)
+        }
+        self.end: int = self.terminal_index[END]
+        self.input_index: Dict[Terminal, int] = {
+            terminal: i for terminal, i in self.terminal_index.items() if i != self.end
+        }
+
+        width = len(self.terminals)
+        symbol_ids = dict(self.terminal_index)
+        for i, non_terminal in enumerate(self.non_terminals):
+            symbol_ids[non_terminal] = width + i
+
+        # Produções numeradas na ordem da gramática, com o corpo já invertido
+        # para ser empilhado (vazio para ε). A tabela é resolvida pelo corpo
+        # de cada produção do não terminal, e não pela identidade da lista.
+        self.productions: List[Production] = []
+        self.bodies: List[Tuple[int, ...]] = []
+        production_ids: Dict[Tuple[NonTerminal, Tuple[str, ...]], int] = {}
+        for non_terminal, bodies in productions.items():
+            for body in bodies:
+                production_ids.setdefault(
+                    (non_terminal, tuple(body)), len(self.productions)
+                )
+                self.productions.append(body)
+                self.bodies.append(
+                    tuple(
+                        symbol_ids[symbol]
+                        for symbol in reversed(body)
+                        if symbol != EPSILON
+                    )
+                )
+
+        self.table = array("l", [ERROR]) * (len(self.non_terminals) * width)
+        for non_terminal, row in table.items():
+            base = (symbol_ids[non_terminal] - width) * width
+            for terminal, production in row.items():
+                self.table[base + self.terminal_index[terminal]] = production_ids[
+                    (non_terminal, tuple(production))
+                ]
+
+        self.initial: int = symbol_ids[initial_symbol]
+
+    @classmethod
+    def from_tables(
+        cls,
+        terminals: List[Terminal],
+        non_terminals: List[NonTerminal],
+        productions: List[Production],
+        table: Sequence[int],
+        initial: int,
+    ) -> "CompiledLL1":
+        """
+        Monta a forma compilada a partir das tabelas já numeradas, por
+        exemplo lidas de um arquivo de cache
+        """
+        compiled = cls.__new__(cls)
+        compiled.terminals = terminals
+        compiled.terminal_index = {terminal: i for i, terminal in enumerate(terminals)}
+        compiled.non_terminals = non_terminals
+        compiled.end = compiled.terminal_index[END]
+        compiled.input_index = {
+            terminal: i
+            for terminal, i in compiled.terminal_index.items()
+            if i != compiled.end
+        }
+
+        width = len(terminals)
+        symbol_ids = dict(compiled.terminal_index)
+        for i, non_terminal in enumerate(non_terminals):
+            symbol_ids[non_terminal] = width + i
+
+        compiled.productions = productions
+        compiled.bodies = [
+            tuple(symbol_ids[symbol] for symbol in reversed(body) if symbol != EPSILON)
+            for body in productions
+        ]
+        compiled.table = table
+        compiled.initial = initial
+        return compiled
+
+    def parse(self, sentence: Sequence[Terminal]) -> List[int]:
+        """
+        Números das produções aplicadas na derivação mais à esquerda da
+        sentença. A sentença é percorrida por índice, sem ser copiada nem
+        alterada.
+        """
+        table = self.table
+        bodies = self.bodies
+        input_index = self.input_index
+        width = len(self.terminals)
+        end = self.end
+        length = len(sentence)
+
+        applied: List[int] = []
+        stack: List[int] = [self.initial]
+        position = 0
+        lookahead = input_index.get(sentence[0], ERROR) if length else end
+        if lookahead == ERROR:
+            raise Exception("Could not parse sentence")
+        while stack:
+            symbol = stack.pop()
+            if symbol < width:
+                if symbol != lookahead:
+                    raise Exception("Could not parse sentence")
+                position += 1
+                if position < length:
+                    lookahead = input_index.get(sentence[position], ERROR)
+                    if lookahead == ERROR:
+                        raise Exception("Could not parse sentence")
+                else:
+                    lookahead = end
+            else:
+                production = table[(symbol - width) * width + lookahead]
+                if production == ERROR:
+                    raise Exception("Could not parse sentence")
+                applied.append(production)
+                stack.extend(bodies[production])
+
+        # Toda a entrada deve ter sido consumida
+        if lookahead != end:
+            raise Exception("Could not parse sentence")
+        return applied
+
+    def parse_stream(
+        self, tokens: Iterable[Any], key: TokenKey = None
+    ) -> Iterator[int]:
+        """
+        Igual a parse, mas lendo os tokens de um iterador com apenas um token
+        de lookahead, e produzindo cada produção assim que é aplicada. A
+        memória usada depende apenas da altura da pilha.
+        """
+        table = self.table
+        bodies = self.bodies
+        width = len(self.terminals)
+
+        tokens = iter(tokens)
+        lookahead = self._lookahead(next(tokens, _DONE), key)
+        stack: List[int] = [self.initial]
+        while stack:
+            symbol = stack.pop()
+            if symbol < width:
+                if symbol != lookahead:
+                    raise Exception("Could not parse sentence")
+                lookahead = self._lookahead(next(tokens, _DONE), key)
+            else:
+                production = table[(symbol - width) * width + lookahead]
+                if production == ERROR:
+                    raise Exception("Could not parse sentence")
+                yield production
+                stack.extend(bodies[production])
+
+        if lookahead != self.end:
+            raise Exception("Could not parse sentence")
+
+    def parse_events(
+        self, tokens: Iterable[Any], key: TokenKey = None
+    ) -> Iterator[Event]:
+        """
+        Análise em fluxo produzindo eventos de entrada e saída de cada não
+        terminal e de cada token consumido, na ordem da árvore de derivação
+        """
+        table = self.table
+        bodies = self.bodies
+        width = len(self.terminals)
+
+        tokens = iter(tokens)
+        token = next(tokens, _DONE)
+        lookahead = self._lookahead(token, key)
+        # Um símbolo s empilhado como ~s marca a saída do não terminal s
+        stack: List[int] = [~self.initial, self.initial]
+        while stack:
+            symbol = stack.pop()
+            if symbol < 0:
+                yield (EXIT, self.non_terminals[~symbol - width])
+            elif symbol < width:
+                if symbol != lookahead:
+                    raise Exception("Could not parse sentence")
+                yield (TOKEN, token)
+                token = next(tokens, _DONE)
+                lookahead = self._lookahead(token, key)
+            else:
+                production = table[(symbol - width) * width + lookahead]
+                if production == ERROR:
+                    raise Exception("Could not parse sentence")
+                yield (
+                    ENTER,
+                    self.non_terminals[symbol - width],
+                    self.productions[production],
+                )
+                for next_symbol in bodies[production]:
+                    if next_symbol >= width:
+                        stack.append(~next_symbol)
+                    stack.append(next_symbol)
+
+        if lookahead != self.end:
+            raise Exception("Could not parse sentence")
+
+    def _lookahead(self, token: Any, key: TokenKey) -> int:
+        if token is _DONE:
+            return self.end
+        terminal = key(token) if key is not None else token
+        index = self.input_index.get(terminal, ERROR)
+        if index == ERROR:
+            raise Exception("Could not parse sentence")
+        return index
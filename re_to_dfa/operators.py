@@ -3,3 +3,17 @@ SIMBOLS = {x: int(1e5) + i for i, x in enumerate("$#()[]")}
 OPERATORS = {x: int(1.1e5) + i for i, x in enumerate("+?.|*")}
 
 OPSMB = {**OPERATORS, **SIMBOLS}
+
+
+def end_marker(pattern: int) -> int:
+    """End marker leaf of the given pattern when several patterns share a tree"""
+    return -1 - pattern
+
+
+def marked_pattern(v):
+    """Pattern ended by an end marker leaf (None for any other leaf)"""
+    if v == SIMBOLS["#"]:
+        return 0
+    if isinstance(v, int) and v < 0:
+        return -1 - v
+    return None
@@ -1,10 +1,41 @@
 from string import ascii_letters, digits, whitespace, printable
+from typing import FrozenSet, Iterator, List, Set, Tuple, Union
 from .operators import *
+from .utf8 import scalar_ranges, utf8_sequences
+
+# Uma folha da árvore é um caractere (ord) ou uma classe de caracteres
+Token = Union[int, FrozenSet[str]]
+
+# Classe de caracteres: o conjunto e se ele é negado (complementado)
+CharClass = Tuple[FrozenSet[str], bool]
+
+# Universo usado por "." e pelas classes negadas; no modo UTF-8 o universo é
+# o de todos os caracteres Unicode
+UNIVERSE = frozenset(printable)
+
+DIGITS = frozenset(digits)
+SPACES = frozenset(whitespace)
+WORD = frozenset(ascii_letters + digits + "_")
+
+CLASSES = {
+    "\\d": (DIGITS, False),
+    "\\D": (DIGITS, True),
+    "\\s": (SPACES, False),
+    "\\S": (SPACES, True),
+    "\\w": (WORD, False),
+    "\\W": (WORD, True),
+    ".": (frozenset("\n"), True),
+}
 
 
 class Regex:
-    def __init__(self, regular_expression) -> None:
+    def __init__(self, regular_expression, utf8: bool = False) -> None:
+        """
+        utf8: build the regex over the bytes of the UTF-8 encoding, each byte
+        read as the latin-1 symbol of the same code
+        """
         self.regex = regular_expression
+        self.utf8 = utf8
         self.run()
 
     def run(self):
@@ -14,37 +45,132 @@ class Regex:
         self.infix_to_postfix()
 
     def supercharge(self):
-        """Support advanced operators like +, ?, \\\\s, \\\\w, \\\\d ..."""
-
-        def l(s):
-            q = [SIMBOLS["("]]
-            for i in s:
-                q.append(ord(i))
-                q.append(OPERATORS["|"])
-            q.pop()
-            q.append(SIMBOLS[")"])
-            return q
-
-        repl = {
-            "\d": l(digits),
-            "\s": l(whitespace),
-            "\w": l(ascii_letters + digits + "_"),
-            ".": l(printable.replace("\n", "")),
-        }
+        """
+        Support character classes as a single leaf: brackets ([a-z0-9_],
+        [^abc]) and shorthands (\\s, \\w, \\d, their negations and .)
+        """
         z = iter(self.regex)
-        a = []
+        a: List[Token] = []
         for i in z:
             if i == "\\":
                 i += next(z)
-            if i in repl:
-                a.extend(repl[i])
-            elif i in OPSMB and i != "#":
+            if i == "[":
+                a.extend(self.leaf(*self.char_class(z)))
+            elif i in CLASSES:
+                a.extend(self.leaf(*CLASSES[i]))
+            elif i in OPSMB and i not in "#]":
                 a.append(OPSMB[i])
             else:
-                a.append(ord(i[-1]))
+                a.extend(self.leaf(frozenset(i[-1]), False))
 
         self.regex = a
 
+    def char_class(self, z: Iterator[str]) -> CharClass:
+        """
+        Read a bracket class up to its closing "]"\n
+        [a-z0-9_] -> ranges and single chars ; [^...] -> negated class
+        """
+        items: List[Tuple[Union[str, CharClass], bool]] = []
+        for i in z:
+            # "]" logo após "[" ou "[^" é um caractere da classe
+            if i == "]" and items and items != [("^", False)]:
+                break
+            if i == "\\":
+                i += next(z)
+                items.append((CLASSES.get(i, i[-1]), True))
+            else:
+                items.append((i, False))
+        else:
+            raise Exception("Invalid")
+
+        negated = items[0] == ("^", False)
+        if negated:
+            items.pop(0)
+
+        # A união de caracteres P com classes negadas U - N1, U - N2, ... é
+        # U - (N1 ∩ N2 ∩ ... - P)
+        chars: Set[str] = set()
+        excluded: Union[Set[str], None] = None
+        k = 0
+        while k < len(items):
+            start = items[k][0]
+            if (
+                k + 2 < len(items)
+                and items[k + 1] == ("-", False)
+                and isinstance(start, str)
+                and isinstance(items[k + 2][0], str)
+            ):
+                end = items[k + 2][0]
+                if ord(end) < ord(start):
+                    raise Exception("Invalid")
+                chars.update(chr(c) for c in range(ord(start), ord(end) + 1))
+                k += 3
+                continue
+
+            if isinstance(start, str):
+                chars.add(start)
+            elif start[1]:
+                excluded = set(start[0]) if excluded is None else excluded & start[0]
+            else:
+                chars.update(start[0])
+            k += 1
+
+        if excluded is not None:
+            return frozenset(excluded - chars), not negated
+        return frozenset(chars), negated
+
+    def leaf(self, chars: FrozenSet[str], negated: bool) -> List[Token]:
+        """Tokens of a character class: a single leaf, or its UTF-8 byte sequences"""
+        if self.utf8:
+            return self.utf8_leaf(chars, negated)
+
+        if negated:
+            chars = UNIVERSE - chars
+        if len(chars) == 1:  # a class with a single char is a plain char leaf
+            return [ord(next(iter(chars)))]
+        return [chars]
+
+    def utf8_leaf(self, chars: FrozenSet[str], negated: bool) -> List[Token]:
+        """
+        UTF-8 form of a character class: an alternation of byte sequences\n
+        [a-zé] -> ((a-z)|(\\xc3.\\xa9))
+        """
+        single: Set[str] = set()
+        sequences: List[List[Token]] = []
+        for low, high in scalar_ranges(chars, negated):
+            for sequence in utf8_sequences(low, high):
+                if len(sequence) == 1:
+                    single.update(map(chr, range(sequence[0][0], sequence[0][1] + 1)))
+                else:
+                    sequences.append(
+                        [
+                            low
+                            if low == high
+                            else frozenset(map(chr, range(low, high + 1)))
+                            for low, high in sequence
+                        ]
+                    )
+
+        # Os caracteres de um byte formam uma única folha
+        if len(single) == 1:
+            sequences.insert(0, [ord(next(iter(single)))])
+        elif single or not sequences:
+            sequences.insert(0, [frozenset(single)])
+
+        if len(sequences) == 1 and len(sequences[0]) == 1:
+            return sequences[0]
+
+        tokens: List[Token] = [SIMBOLS["("]]
+        for sequence in sequences:
+            if len(tokens) > 1:
+                tokens.append(OPERATORS["|"])
+            if len(sequence) > 1:
+                tokens += [SIMBOLS["("], *sequence, SIMBOLS[")"]]
+            else:
+                tokens += sequence
+        tokens.append(SIMBOLS[")"])
+        return tokens
+
     def add_concat(self):
         """
         adds concat (.) operator to the regex\n
@@ -97,7 +223,7 @@ class Regex:
 
         self.regex = b
 
-    def infix_to_postfix(self) -> list[int]:  # shunting yard
+    def infix_to_postfix(self) -> List[Token]:  # shunting yard
         # p={'*':3,'|':2,'.':1} # precedence
         opr, out = [], []
         z = {OPERATORS["*"], OPERATORS["."], OPERATORS["|"]}
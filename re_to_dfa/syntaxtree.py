@@ -1,77 +1,118 @@
+from typing import Dict, List, Tuple
 from re_to_dfa.node import Node
 from .operators import OPERATORS, SIMBOLS
 
 
-class SyntaxTree:
-    def __init__(self, postfixRegex):
-        self.__z = reversed(postfixRegex)
-        self.root = Node(next(self.__z))
-        self.symbols = set(i for i in postfixRegex if i < 1e5 + 2 and i != SIMBOLS["$"])
-        self.__generate(self.root)
+def bits(mask: int) -> List[int]:
+    """Positions (set bits) of a position bitset, in increasing order"""
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
+def isLeaf(v) -> bool:
+    return not isinstance(v, int) or v < 1e5 + 2  # not operator
 
-    def __generate(self, rt: Node):  # dfs
-        if rt.v == OPERATORS["*"]:
-            rt.c1 = Node(next(self.__z))
-            self.__generate(rt.c1)
-        elif rt.v > 1e5 + 1:  # operator
-            rt.c2 = Node(next(self.__z))
-            self.__generate(rt.c2)
-            rt.c1 = Node(next(self.__z))
-            self.__generate(rt.c1)
-        rt.nullable = calcNullable(rt)
-        rt.firstpos = calcFirstpos(rt)
-        rt.lastpos = calcLastpos(rt)
-        calcFollowpos(rt)
 
+class SyntaxTree:
+    """
+    Syntax tree of a postfix regex. nullable, firstpos and lastpos are
+    computed bottom-up while the tree is built, with position sets kept as
+    integer bitsets (bit i set when position i is in the set).
+    """
+
+    def __init__(self, postfixRegex):
+        # Tabela de posições da árvore: o identificador de cada folha
+        self.nodelist: Dict[int, Node] = {}
+        self.symbols = set(
+            i
+            for i in postfixRegex
+            if not isinstance(i, int) or (i < 1e5 + 2 and i != SIMBOLS["$"])
+        )
 
-def calcNullable(n: Node):
-    if n is None:
-        return False
-    if n.c1 == n.c2 == None:  # leaf node
-        if n.v == SIMBOLS["$"]:  # epsilon
-            return True
-        if n._id:
-            return False
-    if n.v == OPERATORS["|"]:
-        return calcNullable(n.c1) or calcNullable(n.c2)
-    if n.v == OPERATORS["."]:
-        return calcNullable(n.c1) and calcNullable(n.c2)
-    if n.v == OPERATORS["*"]:
-        return True
+        # followpos de cada posição, deslocado para a menor posição do
+        # conjunto: a posição followbase[i] + j pertence a followpos(i) quando
+        # o bit j de followbits[i] está ligado. Assim o tamanho de cada
+        # conjunto não depende do número da posição.
+        self.followbase: List[int] = []
+        self.followbits: List[int] = []
 
+        self.root, self.nullable, self.firstpos, self.lastpos = self.__generate(
+            postfixRegex
+        )
 
-def calcFirstpos(n: Node):
-    if n.c1 == n.c2 == None:
-        if n.v == SIMBOLS["$"]:  # epsilon
-            return set()  # emptyset
-        if n._id:
-            return {n._id}
-    if n.v == OPERATORS["|"]:
-        return n.c1.firstpos | n.c2.firstpos
-    if n.v == OPERATORS["."]:
-        return n.c1.firstpos | (n.c2.firstpos if n.c1.nullable else set())
-    if n.v == OPERATORS["*"]:
-        return n.c1.firstpos
+    def followpos(self, position: int) -> List[int]:
+        base = self.followbase[position]
+        return [base + i for i in bits(self.followbits[position])]
 
+    def __generate(self, postfixRegex) -> Tuple[Node, bool, int, int]:
+        # Avaliação da expressão pós-fixa com uma pilha de
+        # (nó, nullable, firstpos, lastpos). As folhas são numeradas do fim
+        # para o começo da expressão.
+        position = sum(1 for v in postfixRegex if isLeaf(v)) + 1
+        self.followbase = [0] * position
+        self.followbits = [0] * position
 
-def calcLastpos(n: Node):
-    if n.c1 == n.c2 == None:
-        if n.v == SIMBOLS["$"]:  # epsilon
-            return set()
-        if n._id:
-            return {n._id}
-    if n.v == OPERATORS["|"]:
-        return n.c1.lastpos | n.c2.lastpos
-    if n.v == OPERATORS["."]:
-        return n.c2.lastpos | (n.c1.lastpos if n.c2.nullable else set())
-    if n.v == OPERATORS["*"]:
-        return n.c1.lastpos
+        stack: List[Tuple[Node, bool, int, int]] = []
+        for v in postfixRegex:
+            if isLeaf(v):
+                position -= 1
+                node = Node(v, _id=position)
+                self.nodelist[position] = node
+                if v == SIMBOLS["$"]:  # epsilon
+                    stack.append((node, True, 0, 0))
+                else:
+                    stack.append((node, False, 1 << position, 1 << position))
+            elif v == OPERATORS["*"]:
+                if not stack:
+                    raise Exception("Invalid")
+                c1, _, firstpos, lastpos = stack.pop()
+                self.__follow(lastpos, firstpos)
+                stack.append((Node(v, c1), True, firstpos, lastpos))
+            else:
+                if len(stack) < 2:
+                    raise Exception("Invalid")
+                c2, nullable2, firstpos2, lastpos2 = stack.pop()
+                c1, nullable1, firstpos1, lastpos1 = stack.pop()
+                if v == OPERATORS["|"]:
+                    stack.append(
+                        (
+                            Node(v, c1, c2),
+                            nullable1 or nullable2,
+                            firstpos1 | firstpos2,
+                            lastpos1 | lastpos2,
+                        )
+                    )
+                else:  # concat
+                    self.__follow(lastpos1, firstpos2)
+                    stack.append(
+                        (
+                            Node(v, c1, c2),
+                            nullable1 and nullable2,
+                            firstpos1 | firstpos2 if nullable1 else firstpos1,
+                            lastpos2 | lastpos1 if nullable2 else lastpos2,
+                        )
+                    )
 
+        if len(stack) != 1:
+            raise Exception("Invalid")
+        return stack[0]
 
-def calcFollowpos(n: Node):
-    if n.v == OPERATORS["."]:
-        for i in n.c1.lastpos:
-            Node.nodelist[i].followpos |= n.c2.firstpos
-    if n.v == OPERATORS["*"]:
-        for i in n.lastpos:
-            Node.nodelist[i].followpos |= n.firstpos
+    def __follow(self, lastpos: int, firstpos: int):
+        """followpos(i) |= firstpos, for every position i in lastpos"""
+        if not firstpos:
+            return
+        low = (firstpos & -firstpos).bit_length() - 1
+        shifted = firstpos >> low
+        for i in bits(lastpos):
+            base, mask = self.followbase[i], self.followbits[i]
+            if not mask:
+                self.followbase[i], self.followbits[i] = low, shifted
+            elif base <= low:
+                self.followbits[i] = mask | (shifted << (low - base))
+            else:
+                self.followbase[i] = low
+                self.followbits[i] = (mask << (base - low)) | shifted
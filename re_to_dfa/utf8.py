@@ -0,0 +1,85 @@
+from typing import Iterable, List, Tuple
+
+# Intervalo fechado de códigos (de caracteres ou de bytes)
+Range = Tuple[int, int]
+
+MAX_SCALAR = 0x10FFFF
+SURROGATES = (0xD800, 0xDFFF)
+
+# Maior caractere codificado com 1, 2 e 3 bytes
+ENCODING_LIMITS = (0x7F, 0x7FF, 0xFFFF)
+
+
+def scalar_ranges(chars: Iterable[str], negated: bool = False) -> List[Range]:
+    """
+    Intervalos de caracteres Unicode de uma classe (ou do seu complemento),
+    sem os substitutos, que não têm codificação UTF-8
+    """
+    ranges: List[Range] = []
+    for code in sorted(set(ord(char) for char in chars)):
+        if ranges and code == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], code)
+        else:
+            ranges.append((code, code))
+
+    if negated:
+        complement: List[Range] = []
+        start = 0
+        for low, high in ranges:
+            if start < low:
+                complement.append((start, low - 1))
+            start = high + 1
+        if start <= MAX_SCALAR:
+            complement.append((start, MAX_SCALAR))
+        ranges = complement
+
+    scalars: List[Range] = []
+    for low, high in ranges:
+        if low < SURROGATES[0]:
+            scalars.append((low, min(high, SURROGATES[0] - 1)))
+        if high > SURROGATES[1]:
+            scalars.append((max(low, SURROGATES[1] + 1), high))
+    return scalars
+
+
+def utf8_sequences(low: int, high: int) -> List[List[Range]]:
+    """
+    Divide um intervalo de caracteres em sequências de intervalos de bytes:
+    os caracteres do intervalo são exatamente as sequências de bytes em que
+    o i-ésimo byte está no i-ésimo intervalo de alguma das sequências
+    """
+    sequences: List[List[Range]] = []
+    stack = [(low, high)]
+    while stack:
+        low, high = stack.pop()
+
+        # Caracteres com codificações de tamanhos diferentes
+        limit = next((m for m in ENCODING_LIMITS if low <= m < high), None)
+        if limit is not None:
+            stack.append((limit + 1, high))
+            stack.append((low, limit))
+            continue
+
+        if high <= 0x7F:
+            sequences.append([(low, high)])
+            continue
+
+        # Divide até que cada byte de continuação cubra todo o seu intervalo
+        # (ou que o prefixo dos dois extremos seja o mesmo)
+        for i in range(1, 4):
+            mask = (1 << (6 * i)) - 1
+            if low & ~mask != high & ~mask:
+                if low & mask != 0:
+                    stack.append(((low | mask) + 1, high))
+                    stack.append((low, low | mask))
+                    break
+                if high & mask != mask:
+                    stack.append((high & ~mask, high))
+                    stack.append((low, (high & ~mask) - 1))
+                    break
+        else:
+            first = chr(low).encode("utf-8")
+            last = chr(high).encode("utf-8")
+            sequences.append(list(zip(first, last)))
+
+    return sequences
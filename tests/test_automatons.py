@@ -10,7 +10,7 @@ parent_dir = os.path.dirname(current_dir)
 # Add the parent directory to the module search path
 sys.path.append(parent_dir)
 
-from automata import NFA, Transitions, DFA
+from automata import NFA, Transitions, DFA, deferred_validation
 
 transitions: Transitions = {
     "→q0": {
@@ -101,3 +101,72 @@ print("------------- MINIMIZATION OF DFAs --------------")
 minimized_dfa = dfa.minimize()
 print(dfa)
 print(repr(dfa))
+
+print("------------- SENTENCE RECOGNIZER --------------")
+
+print(nfa.recognize_sentence("ab"))
+print(nfa.compile() is nfa.compile())
+nfa.final_states.add("q1")
+print(nfa.recognize_sentence("a"))
+
+lazy = nfa.compile_lazy(max_states=2)
+print(lazy.match("ab"), lazy.match("ba"), len(lazy))
+print(nfa.recognize_many(["ab", "a", "bab"], lazy=True))
+
+print("------------- EPSILON CLOSURE --------------")
+
+epsilon_nfa = build_nfa(
+    {
+        "→q0": {"&": {"q1"}},
+        "q1": {"&": {"q0"}, "a": {"q2"}},
+        "*q2": {"&": {"q1"}},
+    }
+)
+print(
+    sorted(epsilon_nfa.epsilon_closure("q0")), sorted(epsilon_nfa.epsilon_closure("q2"))
+)
+print(epsilon_nfa.recognize_sentence("aa"), epsilon_nfa.recognize_sentence(""))
+
+print("------------- MINIMIZATION WITH DEAD STATES --------------")
+
+dead_state_dfa = build_dfa(
+    build_nfa(
+        {
+            "→q0": {"a": {"q1"}, "b": {"q2"}},
+            "*q1": {"a": {"q1"}},
+            "q2": {"a": {"q2"}, "b": {"q2"}},
+        }
+    )
+).minimize()
+print(dead_state_dfa)
+print(sorted(dead_state_dfa.states))
+
+print("------------- ALPHABET AFTER REMOVAL --------------")
+
+edited_dfa = build_dfa(
+    build_nfa({"→q0": {"a": {"q1"}, "c": {"q1"}}, "*q1": {"a": {"q0"}}})
+)
+print(sorted(edited_dfa.alphabet))
+for state in list(edited_dfa.states):
+    edited_dfa.remove_transition(state, "c")
+print(sorted(edited_dfa.alphabet), edited_dfa.recognize_sentence("a"))
+
+print("------------- DEFERRED VALIDATION --------------")
+
+with deferred_validation():
+    pipeline_dfa = build_dfa(build_nfa(transitions)).intersection(
+        build_dfa(build_nfa(transitions2))
+    )
+    pipeline_dfa = pipeline_dfa.minimize()
+print(pipeline_dfa)
+
+print("------------- COMPACT AUTOMATA --------------")
+
+compact_nfa = nfa2.to_compact()
+compact_nfa.add_transition("q2", "b", {"q0"})
+print(compact_nfa)
+print(sorted(compact_nfa.move("q2", "b")), compact_nfa.recognize_sentence("abb"))
+
+compact_dfa = dfa2.to_compact()
+print(compact_dfa)
+print(compact_dfa.to_dfa())
@@ -0,0 +1,96 @@
+import sys
+import os
+import tempfile
+import time
+
+# Get the current directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Get the parent directory
+parent_dir = os.path.dirname(current_dir)
+
+# Add the parent directory to the module search path
+sys.path.append(parent_dir)
+
+from cache import DiskCache, cached_dfa, cached_parser
+from grammars import ContextFreeGrammar
+
+cache = DiskCache(tempfile.mkdtemp())
+
+print("------------ DFA CACHE -------------")
+
+regex = '([a-zA-Z_]\\w*)|(\\d+(\\.\\d+)?)|("[^"]*")'
+
+start = time.perf_counter()
+cold = cached_dfa(regex, cache=cache)
+cold_time = time.perf_counter() - start
+
+start = time.perf_counter()
+warm = cached_dfa(regex, cache=cache)
+warm_time = time.perf_counter() - start
+
+print(f"cold: {cold_time * 1000:.2f} ms, warm: {warm_time * 1000:.2f} ms")
+print(len(warm.states), "states", len(warm.symbols), "symbols")
+
+for sentence in ["x1", "_a_b", "10.5", "10.", '"oi"', '"oi', ""]:
+    print(repr(sentence), cold.match(sentence), warm.match(sentence))
+
+utf8 = cached_dfa("[a-zà-ÿ]+", utf8=True, cache=cache)
+utf8 = cached_dfa("[a-zà-ÿ]+", utf8=True, cache=cache)
+print(
+    utf8.match_bytes("açúcar".encode("utf-8")), utf8.match_bytes("a1".encode("utf-8"))
+)
+
+print("---------- PARSER CACHE -----------")
+
+c = ContextFreeGrammar()
+c.add_production("E", ["T", "E'"])
+c.add_production("E'", ["+", "T", "E'"])
+c.add_production("E'", ["&"])
+c.add_production("T", ["F", "T'"])
+c.add_production("T'", ["*", "F", "T'"])
+c.add_production("T'", ["&"])
+c.add_production("F", ["(", "E", ")"])
+c.add_production("F", ["id"])
+c.initial_symbol = "E"
+
+cold_parser = cached_parser(c, cache=cache)
+warm_parser = cached_parser(c, cache=cache)
+print(warm_parser.table == cold_parser.table)
+print(
+    warm_parser.firsts == cold_parser.firsts, warm_parser.follows == cold_parser.follows
+)
+print(warm_parser.parse(["id", "+", "id", "*", "id"]))
+
+print("---------- CORRUPTED CACHE -----------")
+
+# Arquivos truncados são ignorados e reconstruídos
+for name in os.listdir(cache.directory):
+    path = os.path.join(cache.directory, name)
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data[:20])
+
+print(cached_dfa(regex, cache=cache).match("x1"))
+print(cached_parser(c, cache=cache).parse(["id", "*", "id"]))
+
+
+# O mapeamento do arquivo inválido é fechado antes de ele ser substituído
+class RecordingCache(DiskCache):
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.loaded = []
+
+    def load(self, key):
+        buffer = super().load(key)
+        self.loaded.append(buffer)
+        return buffer
+
+
+recording = RecordingCache(cache.directory)
+for name in os.listdir(cache.directory):
+    with open(os.path.join(cache.directory, name), "wb") as file:
+        file.write(b"LFCT")
+print(cached_dfa(regex, cache=recording).match("x1"))
+print([buffer.closed for buffer in recording.loaded])
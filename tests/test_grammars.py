@@ -52,3 +52,69 @@ a.initial_symbol = "E"
 
 a = a.remove_left_recursion()
 print(a)
+
+print("------------ FIRST -------------")
+
+# FIRST de uma gramática recursiva à esquerda, sem eliminar a recursão
+l = ContextFreeGrammar()
+l.add_production("E", ["E", "+", "T"])
+l.add_production("E", ["T"])
+l.add_production("T", ["T", "*", "F"])
+l.add_production("T", ["F"])
+l.add_production("F", ["(", "E", ")"])
+l.add_production("F", ["id"])
+l.add_production("F", ["O", "id"])
+l.add_production("O", ["-"])
+l.add_production("O", ["&"])
+l.initial_symbol = "E"
+
+for non_terminal, firsts in sorted(l.firsts().items()):
+    print(non_terminal, sorted(firsts))
+
+# E, T e F estão na mesma componente: alterar o FIRST devolvido de um deles
+# não altera o dos outros
+firsts = l.firsts()
+firsts["E"].add("x")
+print(sorted(l.firsts()["E"]), sorted(l.firsts()["T"]))
+
+print(sorted(c.first_of_sequence(["E'", "T'"])))
+print(sorted(c.first_of_sequence(["T'", "F"])))
+# Terminal depois de um prefixo anulável: o ε do prefixo não é mantido
+print(sorted(c.first_of_sequence(["E'", "T'", "id"])))
+print(sorted(l.first_of_sequence(["O", "-"])))
+
+print("------------ FOLLOW -------------")
+
+for non_terminal, follows in sorted(l.follows().items()):
+    print(non_terminal, sorted(follows))
+
+for non_terminal, follows in sorted(c.follows().items()):
+    print(non_terminal, sorted(follows))
+
+print("------------ ANALYSIS CACHE -------------")
+
+g = ContextFreeGrammar()
+g.add_production("Expr", ["Atom", "b"])
+g.add_production("Atom", ["a"])
+g.initial_symbol = "Expr"
+print(sorted(g.firsts()["Expr"]), sorted(g.follows()["Atom"]), sorted(g._nullable()))
+
+# Uma nova produção descarta FIRST, FOLLOW e anuláveis já calculados
+g.add_production("Atom", ["&"])
+g.add_production("Expr", ["Expr", "c"])
+print(sorted(g.firsts()["Expr"]), sorted(g.follows()["Atom"]), sorted(g._nullable()))
+
+# Assim como a troca de todas as produções
+g.replace_non_terminals()
+print(sorted(g.non_terminals), sorted(g.terminals))
+print(sorted(g.firsts()["S"]), sorted(g.follows()["A"]), sorted(g._nullable()))
+
+# Os conjuntos de símbolos são somente leitura
+try:
+    g.terminals.add("x")
+except AttributeError:
+    print("terminals is read-only")
+try:
+    g._nullable().add("S")
+except AttributeError:
+    print("nullable is read-only")
@@ -0,0 +1,80 @@
+import io
+import sys
+import os
+
+# Get the current directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Get the parent directory
+parent_dir = os.path.dirname(current_dir)
+
+# Add the parent directory to the module search path
+sys.path.append(parent_dir)
+
+from automata import Lexer
+
+patterns = [
+    ("IF", "if"),
+    ("ELSE", "else"),
+    ("ID", "[a-zA-Z_]\\w*"),
+    ("NUM", "\\d+(\\.\\d+)?"),
+    ("OP", "([-+*/=<>])|(==)"),
+    ("LP", "\\("),
+    ("RP", "\\)"),
+    ("WS", "\\s+"),
+]
+
+
+def build_lexer(patterns):
+    return Lexer(patterns)
+
+
+print("------------ LEXER DFA -------------")
+
+lexer = build_lexer(patterns)
+print(len(lexer.dfa.states), "states")
+print(sorted(lexer.dfa.alphabet))
+
+print("---------- TOKENIZER -----------")
+
+source = "if (x1 == 10.5) else iff = y+2"
+for token, start, end in lexer.tokenize(source):
+    print(token, repr(source[start:end]))
+
+print("---------- LONGEST MATCH -----------")
+
+print(lexer.match("ifx = 1"))
+print(lexer.match("if x"))
+print(lexer.match("?"))
+
+try:
+    list(lexer.tokenize("x ? y"))
+except Exception as e:
+    print(e)
+
+print("---------- STREAMING TOKENIZER -----------")
+
+chunks = ["if (x1 =", "= 10", ".5) el", "se iff"]
+print(list(lexer.tokenize_stream(chunks)))
+print(
+    list(lexer.tokenize_stream(io.StringIO(source), chunk_size=4))
+    == list(lexer.tokenize(source))
+)
+print(
+    list(lexer.tokenize_stream(source.encode(), chunk_size=3))
+    == list(lexer.tokenize(source))
+)
+
+# Lexemas que voltam ao último estado final: a entrada depois dele não é
+# relida a cada token
+backtracking = Lexer([("A", "a"), ("AB", "a*b")])
+print(list(backtracking.tokenize("aaaab")), list(backtracking.tokenize("aaa")))
+print(len(list(backtracking.tokenize("a" * 100000))))
+print(list(backtracking.tokenize_stream(["aa", "a", "aab", "a"])))
+
+print("---------- UTF-8 LEXER -----------")
+
+lexer = Lexer([("WORD", "[a-zà-ÿ]+"), ("WS", "\\s+"), ("CJK", "[一-鿿]+")], utf8=True)
+data = "olá mundo 中文 über".encode()
+for token, start, end in lexer.tokenize_stream(data, chunk_size=3):
+    print(token, start, end, data[start:end].decode())
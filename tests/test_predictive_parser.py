@@ -13,6 +13,9 @@ sys.path.append(parent_dir)
 
 from grammars import ContextFreeGrammar
 from predictive_parser.LL1 import PredictiveParserLL1
+from predictive_parser.compiled import CompiledLL1, ENTER, TOKEN
+from copy import deepcopy
+from automata import Lexer
 
 # # E -> T E’
 # # E’ -> + T E’
@@ -45,3 +48,105 @@ sentences = [
 for sentence in sentences:
     result = parser.parse(sentence)
     print(result)
+
+print("---------- COMPILED TABLE -----------")
+
+compiled = parser.compile()
+print(compiled.terminals, compiled.non_terminals)
+
+sentence = ["(", "id", "+", "id", ")", "*", "id"]
+print(compiled.parse(sentence))
+print(parser.parse(sentence))
+print(sentence)
+
+# O fim da entrada $ não pode vir da sentença
+for sentence in [
+    ["id", ")"],
+    ["id", "id"],
+    ["(", "id"],
+    [],
+    ["$"],
+    ["id", "$"],
+    ["id", "$", "id", "id"],
+]:
+    try:
+        parser.parse(sentence)
+        print(sentence, "accepted")
+    except Exception as e:
+        print(sentence, e)
+
+# Tabela com cópias das produções da gramática
+copied = CompiledLL1(c.productions, deepcopy(parser.table), c.initial_symbol)
+sentence = ["(", "id", "+", "id", ")", "*", "id"]
+print(copied.parse(sentence) == compiled.parse(sentence))
+
+# Produção não anulável começando por um não terminal anulável: a tabela
+# não recebe entradas do FOLLOW para ela
+g = ContextFreeGrammar()
+g.add_production("S", ["X", "c"])
+g.add_production("X", ["c", "c"])
+g.add_production("X", ["A", "b"])
+g.add_production("A", ["a"])
+g.add_production("A", ["&"])
+g.initial_symbol = "S"
+g_parser = PredictiveParserLL1().from_grammar(g)
+print(g_parser.table["X"]["c"], sorted(g_parser.table["X"]))
+print(g_parser.parse(["c", "c", "c"]))
+
+print("---------- STREAMING PARSER -----------")
+
+lexer = Lexer(
+    [
+        ("id", "[a-z]+"),
+        ("+", "\\+"),
+        ("*", "\\*"),
+        ("(", "\\("),
+        (")", "\\)"),
+        ("WS", " +"),
+    ]
+)
+source = "(a + b) * c"
+tokens = (token for token in lexer.tokenize(source) if token[0] != "WS")
+
+for production in parser.parse_stream(tokens, key=lambda token: token[0]):
+    print(production)
+
+# Árvore de derivação montada a partir dos eventos
+root = ["root"]
+nodes = [root]
+tokens = (token for token in lexer.tokenize(source) if token[0] != "WS")
+for event in parser.parse_events(tokens, key=lambda token: token[0]):
+    if event[0] == ENTER:
+        node = [event[1]]
+        nodes[-1].append(node)
+        nodes.append(node)
+    elif event[0] == TOKEN:
+        name, start, end = event[1]
+        nodes[-1].append(source[start:end])
+    else:
+        nodes.pop()
+print(root[1])
+
+# A análise em fluxo deve concordar com parse e rejeitar as mesmas sentenças
+for sentence in sentences + [["(", "id", "+", "id", ")", "*", "id"]]:
+    print(list(parser.parse_stream(iter(sentence))) == parser.parse(sentence))
+
+for sentence in [
+    ["id", ")"],
+    ["id", "id"],
+    ["(", "id"],
+    ["x"],
+    [],
+    ["$"],
+    ["id", "$"],
+    ["id", "$", "id", "id"],
+]:
+    for name, analyse in (
+        ("stream", parser.parse_stream),
+        ("events", parser.parse_events),
+    ):
+        try:
+            list(analyse(iter(sentence)))
+            print(sentence, name, "accepted")
+        except Exception as e:
+            print(sentence, name, e)
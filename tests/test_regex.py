@@ -13,7 +13,7 @@ sys.path.append(parent_dir)
 
 from automata import DFA
 from re_to_dfa.regex import Regex
-from re_to_dfa.syntaxtree import SyntaxTree
+from re_to_dfa.syntaxtree import SyntaxTree, bits
 
 
 def build_regex(string: str):
@@ -44,3 +44,87 @@ print("---------- SENTENCE RECOGNIZER -----------")
 print(dfa.recognize_sentence("abb"))
 print(dfa.recognize_sentence("abbb"))
 print(dfa.recognize_sentence("bbaab"))
+
+print("---------- COMPILED DFA -----------")
+
+compiled = dfa.compile()
+print(compiled.states, compiled.symbols)
+print(compiled.match("aabb"))
+print(compiled.match("abc"))
+
+dfa.final_states.add(dfa.initial_state)
+print(dfa.compile() is compiled)
+print(dfa.recognize_sentence(""))
+
+print("---------- BATCH RECOGNIZER -----------")
+
+print(dfa.recognize_many(["abb", "abbb", "bbaab", "abb", "abc"]))
+
+print("---------- SYMBOL CLASSES -----------")
+
+r = "\\d+x"
+dfa = build_dfa(build_syntaxt_tree(build_regex(r).get_regex()))
+
+print("Regular Expression: ", r)
+print(dfa)
+print(dfa.recognize_sentence("2024x"))
+print(dfa.recognize_sentence("x"))
+
+r = "a.c"
+dfa = build_dfa(build_syntaxt_tree(build_regex(r).get_regex()))
+
+print("Regular Expression: ", r)
+print(len(dfa.alphabet), len(dfa.symbol_classes))
+print(dfa.recognize_many(["abc", "a c", "ac", "a\nc"]))
+
+print("---------- CHARACTER CLASSES -----------")
+
+r = "[a-z_][a-z0-9_]*"
+dfa = build_dfa(build_syntaxt_tree(build_regex(r).get_regex()))
+
+print("Regular Expression: ", r)
+print(dfa)
+print(dfa.recognize_many(["x", "_tmp1", "snake_case", "1abc", "a-b"]))
+
+r = "[^0-9]\\d"
+dfa = build_dfa(build_syntaxt_tree(build_regex(r).get_regex()))
+
+print("Regular Expression: ", r)
+print(sorted(dfa.alphabet))
+print(dfa.recognize_many(["a1", "-9", "12", "a"]))
+
+print("---------- POSITION TABLES -----------")
+
+first = build_syntaxt_tree(build_regex("ab").get_regex())
+second = build_syntaxt_tree(build_regex("(a|b)*abb").get_regex())
+print(sorted(first.nodelist), sorted(second.nodelist))
+print(bits(first.firstpos), bits(second.firstpos))
+
+print("---------- SEARCH -----------")
+
+r = "(abcd)|c"
+dfa = build_dfa(build_syntaxt_tree(build_regex(r).get_regex()))
+
+print("Regular Expression: ", r)
+print(dfa.search("xxabcd c"))
+print(dfa.search("xxabd"))
+print(list(dfa.finditer("abcd cc abc")))
+
+r = "\\d+"
+dfa = build_dfa(build_syntaxt_tree(build_regex(r).get_regex()))
+
+print("Regular Expression: ", r)
+text = "x = 10 + 205 * y3"
+print([text[start:end] for start, end in dfa.finditer(text)])
+
+print("---------- UTF-8 BYTES -----------")
+
+r = "[a-zà-ÿ]+|\\d"
+dfa = build_dfa(build_syntaxt_tree(Regex(r, utf8=True).get_regex()))
+
+print("Regular Expression: ", r)
+print(len(dfa.states), "states")
+print(dfa.recognize_sentence("ção".encode()))
+print(dfa.recognize_sentence("ção".encode("latin-1")))
+print(dfa.recognize_sentence(memoryview("7".encode())))
+print(len(dfa.compile().byte_table()) // 256)
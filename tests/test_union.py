@@ -75,3 +75,27 @@ print(repr(union))
 
 print(intersection)
 print(repr(intersection))
+
+difference = dfa.difference(dfa2)
+symmetric_difference = dfa.symmetric_difference(dfa2)
+
+print(difference)
+print(symmetric_difference)
+print(
+    difference.recognize_sentence("ab"), symmetric_difference.recognize_sentence("abb")
+)
+
+print("--------- COMPLEMENTING PRODUCT ------------")
+
+# L1 = {a} e L2 = {a, b}: predicados que aceitam quando os dois lados rejeitam
+single = build_dfa(build_nfa({"→q0": {"a": {"q1"}}, "*q1": {}}))
+pair = build_dfa(build_nfa({"→q0": {"a": {"q1"}, "b": {"q1"}}, "*q1": {}}))
+
+equal = single.product(pair, lambda p, q: p == q)
+neither = single.product(pair, lambda p, q: not p and not q)
+for sentence in ["", "a", "b", "aa", "ab", "bb", "bab"]:
+    print(
+        repr(sentence),
+        equal.recognize_sentence(sentence),
+        neither.recognize_sentence(sentence),
+    )